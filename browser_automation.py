@@ -4,15 +4,36 @@ Provides `BrowserManager` to manage Playwright lifecycle, create contexts with
 device emulation, capture full-page screenshots, and handle common overlays.
 """
 import asyncio
+import atexit
+import base64
+import functools
+import glob
 import sys
 from playwright.async_api import async_playwright
-from config import BROWSER_LAUNCH, BROWSERS, DEFAULT_SETTINGS, PLAYWRIGHT_DEVICE_MAP
+from urllib.parse import urlsplit
+from config import (
+    AUTH_STATES,
+    BROWSER_LAUNCH,
+    BROWSERS,
+    CHROMIUM_LAUNCH_ARGS,
+    DEFAULT_SETTINGS,
+    IMAGE_COMPARISON,
+    PLAYWRIGHT_DEVICE_MAP,
+    READY_SELECTORS,
+    RESOURCE_BLOCK_MODES,
+    THIRD_PARTY_BLOCKLIST,
+)
 import io
+import cv2
+import numpy as np
 from PIL import Image
 import warnings
 import logging
 import os
+import re
 import subprocess
+import threading
+import weakref
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,6 +53,14 @@ if sys.platform.startswith("win"):
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
     except Exception:
         pass
+else:
+    # uvloop (optional `speed` extra) dispatches Playwright's pipe traffic faster than the
+    # default selector loop; only loops created after import (the capture loops) use it
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except Exception:
+        pass
 
 # Geo-location proxy mechanism removed - keeping simple locale support only
 
@@ -46,6 +75,95 @@ if (!navigator.languages || navigator.languages.length === 0) {
 }
 """
 
+# Cookie banners and modal overlays hidden before capture
+_OVERLAY_SELECTORS = (
+    '[data-testid="cookie-banner"]',
+    '.cookie-banner',
+    '.cookie-notice',
+    '.gdpr-banner',
+    '.modal-overlay',
+    '[role="dialog"]',
+    '.popup-overlay',
+    '#cookie-consent',
+)
+
+# Visible buttons clicked when their text contains one of these (case-insensitive)
+_ACCEPT_BUTTON_TEXTS = ('accept', 'ok', 'close', 'got it')
+_ACCEPT_BUTTON_SELECTORS = ('[data-testid="accept-cookies"]',)
+
+# One round-trip: click visible accept buttons, then hide whatever overlays remain
+DISMISS_OVERLAYS_SCRIPT = """
+([overlaySelectors, acceptTexts, acceptSelectors]) => {
+    const visible = (el) => !!(el && el.offsetParent !== null);
+    let clicked = 0;
+    const buttons = Array.from(document.querySelectorAll('button, [role="button"]')).filter(visible);
+    for (const text of acceptTexts) {
+        const button = buttons.find(b => (b.innerText || '').trim().toLowerCase().includes(text));
+        if (button) { try { button.click(); clicked++; } catch (e) {} }
+    }
+    for (const sel of acceptSelectors) {
+        const el = document.querySelector(sel);
+        if (visible(el)) { try { el.click(); clicked++; } catch (e) {} }
+    }
+    for (const sel of overlaySelectors) {
+        document.querySelectorAll(sel).forEach(el => { el.style.display = 'none'; });
+    }
+    return clicked;
+}
+"""
+
+# Serialized once; Playwright expects lists rather than tuples
+_DISMISS_OVERLAYS_ARGS = [list(_OVERLAY_SELECTORS), list(_ACCEPT_BUTTON_TEXTS), list(_ACCEPT_BUTTON_SELECTORS)]
+
+# Final pre-capture pass in one round-trip: wait for web fonts, then dismiss overlays
+PREPARE_PAGE_SCRIPT = f"""
+async (args) => {{
+    if (document.fonts && document.fonts.ready) {{
+        try {{ await document.fonts.ready; }} catch (e) {{}}
+    }}
+    const clicked = ({DISMISS_OVERLAYS_SCRIPT.strip()})(args);
+    return {{
+        clicked,
+        readyState: document.readyState,
+        height: document.documentElement ? document.documentElement.scrollHeight : 0,
+    }};
+}}
+"""
+
+# Readiness that resolves faster than this gets a short hydration buffer before capture
+INSTANT_READY_SECONDS = 0.05
+HYDRATION_BUFFER_SECONDS = 0.5
+
+PRECONNECT_SCRIPT = """
+(origins) => {
+    const parent = document.head || document.documentElement;
+    for (const origin of origins) {
+        const link = document.createElement('link');
+        link.rel = 'preconnect';
+        link.href = origin;
+        parent.appendChild(link);
+    }
+}
+"""
+
+CLEAR_STORAGE_SCRIPT = "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+
+# What page.screenshot(animations='disabled', caret='hide') does, for raw CDP captures:
+# finite animations jump to their end state, infinite ones are cancelled
+FREEZE_PAGE_SCRIPT = """
+() => {
+    for (const animation of document.getAnimations()) {
+        try { animation.finish(); } catch (e) { animation.cancel(); }
+    }
+    const style = document.createElement('style');
+    style.textContent = '* { caret-color: transparent !important; }';
+    (document.head || document.documentElement).appendChild(style);
+}
+"""
+
+# PIL's ImageFilter.SMOOTH kernel, the "degenerate" image ImageEnhance.Sharpness blends against
+_SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
+
 CLOUDFLARE_TITLE_MARKERS = (
     'just a moment',
     'attention required',
@@ -62,78 +180,203 @@ CLOUDFLARE_BODY_MARKERS = (
 )
 
 
-class BrowserManager:
-    """Manage Playwright, browsers/contexts, and screenshot capture."""
-    def __init__(self):
-        self.playwright = None
-        self.browsers = {}
-        self.is_wsl = self._detect_wsl()
-        self.windows_browser_paths = self._get_windows_browser_paths()
-    
-    def _detect_wsl(self):
-        """Detect if running in WSL environment."""
+# Requests aborted when third-party blocking is on. URL patterns (rather than a catch-all
+# handler) let the browser skip interception for every other request.
+BLOCKED_HOSTS_RE = re.compile(
+    r'^[a-z][a-z0-9+.-]*://([^/?#@]*\.)?('
+    + '|'.join(re.escape(host) for host in THIRD_PARTY_BLOCKLIST)
+    + r')(:\d+)?([/?#]|$)',
+    re.IGNORECASE,
+)
+BLOCKED_MEDIA_RE = re.compile(r'\.(mp4|webm|ogv|ogg|mp3|m4a|mov|m3u8|mpd)([?#]|$)', re.IGNORECASE)
+
+# Launch flags shared by every engine
+BASE_ARGS = (
+    '--disable-blink-features=AutomationControlled',
+    '--no-first-run',
+    '--no-default-browser-check',
+)
+
+# Mobile emulation options Firefox contexts reject
+FIREFOX_DISALLOWED_CONTEXT_KEYS = frozenset({
+    'isMobile', 'is_mobile', 'hasTouch', 'has_touch', 'deviceScaleFactor', 'device_scale_factor',
+})
+
+# Containers lack a usable sandbox and have a tiny /dev/shm
+CONTAINER_ARGS = ('--no-sandbox', '--disable-dev-shm-usage')
+
+# Playwright drivers are bound to the event loop that started them, so managers on the
+# same loop share one driver: loop -> {'playwright', 'refs', 'lock'}
+_shared_playwright = weakref.WeakKeyDictionary()
+_shared_playwright_guard = threading.Lock()
+
+# Common Windows browser install locations as seen from WSL (glob patterns allowed)
+WINDOWS_BROWSER_PATHS = {
+    'chrome': [
+        '/mnt/c/Program Files/Google/Chrome/Application/chrome.exe',
+        '/mnt/c/Program Files (x86)/Google/Chrome/Application/chrome.exe',
+        '/mnt/c/Users/*/AppData/Local/Google/Chrome/Application/chrome.exe'
+    ],
+    'edge': [
+        '/mnt/c/Program Files (x86)/Microsoft/Edge/Application/msedge.exe',
+        '/mnt/c/Program Files/Microsoft/Edge/Application/msedge.exe'
+    ],
+    'firefox': [
+        '/mnt/c/Program Files/Mozilla Firefox/firefox.exe',
+        '/mnt/c/Program Files (x86)/Mozilla Firefox/firefox.exe'
+    ]
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_wsl():
+    """Detect if running in WSL environment (checked once per process)."""
+    try:
+        # Check for WSL-specific environment variables
+        if os.environ.get('WSL_DISTRO_NAME') or os.environ.get('WSLENV'):
+            return True
+        
+        # Check for Rancher Desktop environment
+        if os.environ.get('RANCHER_DESKTOP'):
+            return True
+        
+        # Check for WSL in uname
         try:
-            # Check for WSL-specific environment variables
-            if os.environ.get('WSL_DISTRO_NAME') or os.environ.get('WSLENV'):
-                return True
-            
-            # Check for Rancher Desktop environment
-            if os.environ.get('RANCHER_DESKTOP'):
+            result = subprocess.run(['uname', '-r'], capture_output=True, text=True, timeout=5)
+            if 'microsoft' in result.stdout.lower() or 'wsl' in result.stdout.lower():
                 return True
-            
-            # Check for WSL in uname
-            try:
-                result = subprocess.run(['uname', '-r'], capture_output=True, text=True, timeout=5)
-                if 'microsoft' in result.stdout.lower() or 'wsl' in result.stdout.lower():
-                    return True
-            except:
-                pass
-            
-            # Check for WSL in /proc/version
-            try:
-                with open('/proc/version', 'r') as f:
-                    version_info = f.read().lower()
-                    if 'microsoft' in version_info or 'wsl' in version_info:
-                        return True
-            except:
-                pass
-                
-            return False
         except:
-            return False
-    
-    def _get_windows_browser_paths(self):
-        """Get paths to Windows browsers for WSL integration."""
-        if not self.is_wsl:
-            return {}
-        
-        browser_paths = {}
-        
-        # Common Windows browser paths
-        windows_paths = {
-            'chrome': [
-                '/mnt/c/Program Files/Google/Chrome/Application/chrome.exe',
-                '/mnt/c/Program Files (x86)/Google/Chrome/Application/chrome.exe',
-                '/mnt/c/Users/*/AppData/Local/Google/Chrome/Application/chrome.exe'
-            ],
-            'edge': [
-                '/mnt/c/Program Files (x86)/Microsoft/Edge/Application/msedge.exe',
-                '/mnt/c/Program Files/Microsoft/Edge/Application/msedge.exe'
-            ],
-            'firefox': [
-                '/mnt/c/Program Files/Mozilla Firefox/firefox.exe',
-                '/mnt/c/Program Files (x86)/Mozilla Firefox/firefox.exe'
-            ]
-        }
-        
-        # Check which browsers are available
-        for browser, paths in windows_paths.items():
-            for path in paths:
-                if os.path.exists(path):
-                    browser_paths[browser] = path
-                    break
+            pass
         
-        return browser_paths
+        # Check for WSL in /proc/version
+        try:
+            with open('/proc/version', 'r') as f:
+                version_info = f.read().lower()
+                if 'microsoft' in version_info or 'wsl' in version_info:
+                    return True
+        except:
+            pass
+            
+        return False
+    except:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _get_windows_browser_paths():
+    """Get paths to Windows browsers for WSL integration (scanned once per process)."""
+    browser_paths = {}
+    for browser, paths in WINDOWS_BROWSER_PATHS.items():
+        for path in paths:
+            matches = sorted(glob.glob(path)) if '*' in path else ([path] if os.path.exists(path) else [])
+            if matches:
+                browser_paths[browser] = matches[0]
+                break
+    return browser_paths
+
+
+class LazyImage:
+    """Encoded screenshot bytes that decode into a PIL image only when needed.
+
+    ``max_width`` downscales wider captures on decode; ``transform`` (e.g.
+    quality enhancement) is applied once after that.
+    """
+    def __init__(self, data, format='png', transform=None, max_width=None):
+        self.data = data
+        self.format = format
+        self._transform = transform
+        self._max_width = max_width or None
+        self._image = None
+
+    def _scaled_size(self, size):
+        """Size after the ``max_width`` downscale, preserving aspect ratio."""
+        width, height = size
+        if not self._max_width or width <= self._max_width:
+            return size
+        return self._max_width, max(1, round(height * self._max_width / width))
+
+    def _downscaled(self):
+        """Whether decoding shrinks the capture below its native size."""
+        size = Image.open(io.BytesIO(self.data)).size
+        return self._scaled_size(size) != size
+
+    @property
+    def image(self):
+        """Decoded (and transformed) PIL image, cached after the first access."""
+        if self._image is None:
+            image = Image.open(io.BytesIO(self.data))
+            target = self._scaled_size(image.size)
+            if target != image.size:
+                # JPEG decodes straight to a reduced scale; other formats ignore this
+                image.draft('RGB', target)
+            # Decode now, on the calling (worker) thread, not on whichever thread touches pixels first
+            image.load()
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            if image.size != target:
+                image = image.resize(target, Image.Resampling.LANCZOS)
+            if self._transform is not None:
+                image = self._transform(image)
+            self._image = image
+        return self._image
+
+    @property
+    def size(self):
+        """Image dimensions; reads only the header if not yet decoded."""
+        if self._image is not None:
+            return self._image.size
+        return self._scaled_size(Image.open(io.BytesIO(self.data)).size)
+
+    @property
+    def png_bytes(self):
+        """PNG bytes of the final image, reusing the capture when nothing changed it."""
+        if self.format == 'png' and self._transform is None and not self._downscaled():
+            return self.data
+        buffer = io.BytesIO()
+        self.image.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+
+def _warn_unclosed(browsers):
+    """Finalizer: browsers cannot be closed once their loop may be gone, so only report them."""
+    if browsers:
+        logger.warning(
+            f"BrowserManager collected with open browsers ({', '.join(browsers)}); "
+            "use 'async with BrowserManager()' or await cleanup()"
+        )
+
+
+class BrowserManager:
+    """Manage Playwright, browsers/contexts, and screenshot capture.
+
+    Browsers are subprocesses bound to the event loop that launched them, so
+    they are not closed on garbage collection: use ``async with`` or await
+    ``cleanup()`` on that loop.
+    """
+    def __init__(self):
+        self.playwright = None
+        self.browsers = {}
+        # Contexts are reused across screenshots with the same browser/device/viewport/region
+        self.contexts = {}
+        self._context_locks = {}
+        # run_ids already passed to reset_contexts; late captures must not pool new contexts for them
+        self._closed_runs = set()
+        # Warm pages per pooled context, reset to about:blank between captures
+        self._page_pools = {}
+        # Playwright device descriptors by friendly device name, filled in initialize()
+        self._device_descriptors = {}
+        # Decode-time transform for captures; None stores them byte-for-byte as captured
+        self._screenshot_transform = (
+            self._enhance_screenshot_quality if DEFAULT_SETTINGS.get('enhance_screenshots') else None
+        )
+        # Created lazily so it binds to the event loop that runs the captures
+        self._launch_lock = None
+        # Per-browser page limits for screenshot_many, also bound to the capture loop
+        self._page_semaphores = {}
+        self.is_wsl = _detect_wsl()
+        self.windows_browser_paths = _get_windows_browser_paths() if self.is_wsl else {}
+        # Holds the browsers dict, not self, so the finalizer never keeps the manager alive
+        weakref.finalize(self, _warn_unclosed, self.browsers)
     
     def _get_windows_browser_path(self, browser_name):
         """Get Windows browser path for specific browser."""
@@ -156,24 +399,29 @@ class BrowserManager:
             and BROWSER_LAUNCH.get('use_installed_browser', True)
         )
 
+    def _launch_name(self, browser_name):
+        """Browser whose process serves ``browser_name``; Edge shares Chrome unless configured."""
+        if browser_name == 'Edge' and not BROWSER_LAUNCH.get('use_edge_channel', False):
+            return 'Chrome'
+        return browser_name
+
     def _build_launch_options(self, browser_name):
         """Build launch options that resemble a normal desktop browser session."""
         headless = BROWSER_LAUNCH.get('headless', True)
         in_container = os.path.exists('/.dockerenv') or os.environ.get('CONTAINER')
 
-        args = [
-            '--disable-blink-features=AutomationControlled',
-            '--no-first-run',
-            '--no-default-browser-check',
-        ]
-        if headless and browser_name in ('Chrome', 'Edge'):
+        is_chromium = browser_name in ('Chrome', 'Edge')
+        args = list(BASE_ARGS)
+        if is_chromium:
+            args.extend(CHROMIUM_LAUNCH_ARGS)
+        if headless and is_chromium:
             # Chrome new headless uses a normal user agent (no "HeadlessChrome" prefix)
             launch_options_extra = {'ignore_default_args': ['--headless']}
             args.append('--headless=new')
         else:
             launch_options_extra = {}
         if in_container:
-            args.extend(['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu'])
+            args.extend(CONTAINER_ARGS)
 
         launch_options = {'headless': headless, 'args': args, **launch_options_extra}
 
@@ -192,12 +440,50 @@ class BrowserManager:
         return launch_options
     
     async def initialize(self):
-        """Start Playwright if not already started."""
+        """Attach to this event loop's shared Playwright driver, starting it if needed."""
         if self.playwright is None:
-            self.playwright = await async_playwright().start()
+            loop = asyncio.get_running_loop()
+            with _shared_playwright_guard:
+                shared = _shared_playwright.get(loop)
+                if shared is None:
+                    shared = _shared_playwright[loop] = {'playwright': None, 'refs': 0, 'lock': asyncio.Lock()}
+            async with shared['lock']:
+                if shared['playwright'] is None:
+                    shared['playwright'] = await async_playwright().start()
+                shared['refs'] += 1
+                self.playwright = shared['playwright']
+            # The descriptor set is static; resolve the few devices we emulate once
+            devices = self.playwright.devices
+            self._device_descriptors = {
+                name: dict(devices[descriptor])
+                for name, descriptor in PLAYWRIGHT_DEVICE_MAP.items()
+                if descriptor in devices
+            }
+
+    async def _release_playwright(self):
+        """Drop this manager's reference; the last one on the loop stops the driver."""
+        playwright, self.playwright = self.playwright, None
+        shared = _shared_playwright.get(asyncio.get_running_loop())
+        if shared is None or shared['playwright'] is not playwright:
+            await playwright.stop()
+            return
+        async with shared['lock']:
+            shared['refs'] -= 1
+            if shared['refs'] <= 0:
+                shared['playwright'] = None
+                await playwright.stop()
     
     async def get_browser(self, browser_name):
         """Get or launch a browser engine by friendly name (Chrome, Firefox...)."""
+        browser_name = self._launch_name(browser_name)
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        # Serialize launches so concurrent captures share one browser per name
+        async with self._launch_lock:
+            return await self._get_or_launch_browser(browser_name)
+
+    async def _get_or_launch_browser(self, browser_name):
+        """Return a connected cached browser or launch a new one."""
         await self.initialize()
         
         # Check if browser exists and is still connected
@@ -230,6 +516,16 @@ class BrowserManager:
             raise ValueError(f"Unsupported browser: {browser_name}")
         
         browser_engine = browser_map[browser_name]
+
+        cdp_endpoint = BROWSER_LAUNCH.get('cdp_endpoint')
+        if cdp_endpoint and browser_name in ('Chrome', 'Edge'):
+            try:
+                self.browsers[browser_name] = await self.playwright.chromium.connect_over_cdp(cdp_endpoint)
+                logger.info("Connected %s to shared browser at %s", browser_name, cdp_endpoint)
+                return self.browsers[browser_name]
+            except Exception as e:
+                logger.warning("Could not connect to shared browser at %s: %s; launching locally", cdp_endpoint, e)
+
         launch_options = self._build_launch_options(browser_name)
 
         try:
@@ -259,35 +555,31 @@ class BrowserManager:
         
         return self.browsers[browser_name]
     
-    async def create_context(self, browser, viewport, device_name=None, user_agent=None, browser_name=None, region=None):
+    async def create_context(self, browser, viewport, device_name=None, user_agent=None, browser_name=None, region=None, block_third_party=None, block_resources=None, storage_state_path=None):
         """Create a browser context with viewport and optional device emulation."""
         context_options = {
             'ignore_https_errors': DEFAULT_SETTINGS['ignore_https_errors'],
             'java_script_enabled': True,
             'extra_http_headers': {'Accept-Language': 'en-US,en;q=0.9'},
         }
+        if storage_state_path:
+            context_options['storage_state'] = storage_state_path
 
         # Prefer built-in device descriptors when possible
         used_descriptor = False
-        if device_name and self.playwright is not None:
-            descriptor_name = PLAYWRIGHT_DEVICE_MAP.get(device_name)
-            if descriptor_name:
-                try:
-                    dopt = self.playwright.devices.get(descriptor_name)
-                    if dopt:
-                        # Merge full descriptor, including viewport
-                        for k, v in dopt.items():
-                            context_options[k] = v
-                        used_descriptor = True
-                except Exception:
-                    used_descriptor = False
+        descriptor = self._device_descriptors.get(device_name) if device_name else None
+        if descriptor:
+            # Merge full descriptor, including viewport
+            context_options.update(descriptor)
+            used_descriptor = True
 
         if user_agent:
             context_options['user_agent'] = user_agent
         elif browser_name and browser_name in BROWSERS and not used_descriptor:
             browser_cfg = BROWSERS[browser_name]
             use_native_ua = (
-                self._uses_system_browser(browser_name)
+                self._launch_name(browser_name) == browser_name
+                and self._uses_system_browser(browser_name)
                 and not BROWSER_LAUNCH.get('headless', True)
             )
             # Headless Chrome exposes "HeadlessChrome" in UA — override for bot protection
@@ -313,12 +605,13 @@ class BrowserManager:
 
         # Firefox does not support some mobile emulation context options
         if (browser_name or '').lower() == 'firefox':
-            for k in ['isMobile', 'is_mobile', 'hasTouch', 'has_touch', 'deviceScaleFactor', 'device_scale_factor']:
-                context_options.pop(k, None)
+            context_options = {
+                k: v for k, v in context_options.items() if k not in FIREFOX_DISALLOWED_CONTEXT_KEYS
+            }
         else:
-            # For desktop contexts, capture sharper screenshots by using higher DPR
+            # Desktop DPR is configurable; higher values render sharper but cost more per pixel
             if (not device_name or 'desktop' in (device_name or '').lower()) and not used_descriptor:
-                context_options.setdefault('device_scale_factor', 2)
+                context_options.setdefault('device_scale_factor', DEFAULT_SETTINGS.get('device_scale_factor', 1))
 
         # If no descriptor (e.g., Desktop), set explicit viewport from config
         if not used_descriptor and viewport:
@@ -334,8 +627,179 @@ class BrowserManager:
 
         context = await browser.new_context(**context_options)
         await context.add_init_script(STEALTH_INIT_SCRIPT)
+        blocked_types = self._resource_block_set(block_resources)
+        if blocked_types:
+            # Registered first so the narrower URL routes below take precedence
+            await context.route('**/*', functools.partial(self._resource_type_route, blocked_types))
+        if block_third_party is None:
+            block_third_party = BROWSER_LAUNCH.get('block_third_party', True)
+        if block_third_party:
+            await context.route(BLOCKED_HOSTS_RE, self._abort_route)
+            await context.route(BLOCKED_MEDIA_RE, self._abort_route)
+        # Viewport metrics are fixed by the context options; record them instead of asking each page
+        context._vrt_metrics = self._context_metrics(context_options)
         return context
 
+    async def _abort_route(self, route):
+        """Abort a blocked request without failing the page."""
+        try:
+            await route.abort()
+        except Exception:
+            pass
+
+    async def _resource_type_route(self, blocked_types, route):
+        """Abort requests whose resource type is blocked; let everything else through."""
+        try:
+            if route.request.resource_type in blocked_types:
+                await route.abort()
+            else:
+                await route.fallback()
+        except Exception:
+            pass
+
+    def _resource_block_set(self, block_resources):
+        """Normalize a ``RESOURCE_BLOCK_MODES`` name or iterable of resource types."""
+        if not block_resources:
+            return None
+        if isinstance(block_resources, str):
+            if block_resources not in RESOURCE_BLOCK_MODES:
+                raise ValueError(f"Unknown resource block mode: {block_resources}")
+            block_resources = RESOURCE_BLOCK_MODES[block_resources]
+        return frozenset(block_resources)
+
+    def _storage_state_for(self, url):
+        """Saved storageState file configured for this URL's host, if it exists."""
+        path = AUTH_STATES.get(urlsplit(url).hostname or '')
+        if path and not os.path.isfile(path):
+            logger.warning(f"Auth state {path} not found; capturing {url} logged out")
+            return None
+        return path
+
+    def _context_metrics(self, context_options):
+        """Runtime viewport metrics implied by the options a context was created with."""
+        viewport = context_options.get('viewport') or {'width': 1280, 'height': 720}
+        screen = context_options.get('screen') or viewport
+        return {
+            'innerWidth': viewport.get('width'),
+            'innerHeight': viewport.get('height'),
+            'devicePixelRatio': context_options.get('device_scale_factor', 1),
+            'userAgent': context_options.get('user_agent', ''),
+            'screen': {'width': screen.get('width'), 'height': screen.get('height')},
+        }
+
+    def _context_key(self, browser_name, viewport, device_name=None, region=None, block_third_party=None, block_resources=None, storage_state_path=None, run_id=None):
+        """Pool key for contexts that can be shared between screenshots of one run.
+
+        ``run_id`` is last so ``reset_contexts`` can close one run's contexts
+        without touching those of other runs sharing the manager.
+        """
+        return (
+            browser_name,
+            device_name or 'desktop',
+            frozenset((viewport or {}).items()),
+            region,
+            block_third_party,
+            self._resource_block_set(block_resources),
+            storage_state_path,
+            run_id,
+        )
+
+    async def _acquire_context(self, browser_name, viewport, device_name=None, region=None, block_third_party=None, block_resources=None, storage_state_path=None, run_id=None):
+        """Return a pooled context for this configuration, creating it on first use."""
+        key = self._context_key(
+            browser_name, viewport, device_name, region, block_third_party, block_resources, storage_state_path,
+            run_id,
+        )
+        lock = self._context_locks.get(key)
+        if lock is None:
+            lock = self._context_locks[key] = asyncio.Lock()
+        async with lock:
+            if run_id is not None and run_id in self._closed_runs:
+                raise RuntimeError(f"Run {run_id} has already been reset")
+            browser = await self.get_browser(browser_name)
+            context = self.contexts.get(key)
+            # A relaunched browser invalidates contexts created on the old one
+            if context is not None and context.browser is browser:
+                return context
+            context = await self.create_context(
+                browser, viewport, device_name=device_name, browser_name=browser_name, region=region,
+                block_third_party=block_third_party, block_resources=block_resources,
+                storage_state_path=storage_state_path,
+            )
+            self.contexts[key] = context
+            return context
+
+    async def _discard_context(self, context):
+        """Close a pooled context and forget it so the next attempt starts fresh."""
+        for key, pooled in list(self.contexts.items()):
+            if pooled is context:
+                del self.contexts[key]
+        self._page_pools.pop(context, None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def _get_page(self, context):
+        """Return ``(page, is_new)``, reusing a warm page from the context's pool when possible."""
+        pool = self._page_pools.get(context)
+        while pool is not None and not pool.empty():
+            page = pool.get_nowait()
+            if not page.is_closed():
+                return page, False
+        return await context.new_page(), True
+
+    async def _release_page(self, context, page):
+        """Reset a page and return it to the pool; pages that fail to reset are closed."""
+        try:
+            # Storage is per origin, so clear it before leaving the captured page
+            await page.evaluate(CLEAR_STORAGE_SCRIPT)
+            await page.goto('about:blank')
+            self._pool_page(context, page)
+        except Exception:
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+    def _pool_page(self, context, page):
+        """Queue a blank page for reuse; raises ``asyncio.QueueFull`` when the pool is full."""
+        pool = self._page_pools.get(context)
+        if pool is None:
+            pool = self._page_pools[context] = asyncio.Queue(
+                maxsize=BROWSER_LAUNCH.get('max_concurrent_pages', 4)
+            )
+        pool.put_nowait(page)
+
+    async def warm_origins(self, urls, browser_name, viewport, device_name=None, region=None, run_id=None):
+        """Preconnect the pooled context for this configuration to each origin in ``urls``.
+
+        DNS, TCP and TLS setup then overlap with other work instead of
+        delaying the first navigation to each origin.
+        """
+        by_state = {}
+        for url in urls:
+            parsed = urlsplit(url)
+            if parsed.scheme in ('http', 'https') and parsed.netloc:
+                origin = f"{parsed.scheme}://{parsed.netloc}"
+                by_state.setdefault(self._storage_state_for(url), set()).add(origin)
+
+        for storage_state_path, origins in by_state.items():
+            context = await self._acquire_context(
+                browser_name, viewport, device_name=device_name, region=region,
+                storage_state_path=storage_state_path, run_id=run_id,
+            )
+            page, _ = await self._get_page(context)
+            try:
+                await page.evaluate(PRECONNECT_SCRIPT, sorted(origins))
+                # Still on about:blank; navigating away could cancel the preconnects
+                self._pool_page(context, page)
+            except Exception:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
     async def _is_cloudflare_challenge(self, page):
         """Return True when the page still looks like a Cloudflare interstitial."""
         try:
@@ -379,27 +843,48 @@ class BrowserManager:
             await page.goto(url, wait_until='load', timeout=timeout)
         await self._wait_for_cloudflare(page)
     
-    async def take_screenshot(self, url, browser_name, viewport, wait_time=3, device_name=None, return_metrics=False, region=None, max_retries=3):
-        """Take a full-page screenshot and optionally return runtime metrics."""
+    async def take_screenshot(self, url, browser_name, viewport, wait_time=3, device_name=None, return_metrics=False, region=None, max_retries=3, force_wait=0, screenshot_format='png', block_third_party=None, block_resources=None, ready_selector=None, run_id=None):
+        """Take a full-page screenshot and optionally return runtime metrics.
+
+        ``wait_time`` caps how long to wait for the network to go idle;
+        ``force_wait`` adds an unconditional sleep for pages that keep
+        animating after that. ``screenshot_format='jpeg'`` trades exactness
+        for much smaller, faster-to-decode captures in quick pre-checks.
+        ``block_third_party`` overrides ``BROWSER_LAUNCH['block_third_party']``;
+        ``block_resources`` (a ``RESOURCE_BLOCK_MODES`` name or resource types)
+        aborts whole resource types for layout-only checks.
+        ``ready_selector`` (default: ``READY_SELECTORS`` for the URL's host)
+        replaces the load-state waits once that element is visible.
+        ``run_id`` scopes pooled contexts to one run (see ``reset_contexts``).
+
+        Returns a ``LazyImage`` (plus the metrics dict when ``return_metrics``).
+        """
         from utils import validate_url
         if not validate_url(url):
             logger.error(f"Rejected invalid or blocked URL: {url}")
             return None
+        block_resources = self._resource_block_set(block_resources)
+        storage_state_path = self._storage_state_for(url)
+        if ready_selector is None:
+            ready_selector = READY_SELECTORS.get(urlsplit(url).hostname or '')
 
-        context = None
         last_error = None
         
         for attempt in range(max_retries):
+            context = None
+            page = None
+            page_reusable = False
             try:
                 logger.info(f"Starting screenshot for {url} with region: {region} (attempt {attempt + 1}/{max_retries})")
-                browser = await self.get_browser(browser_name)
-                if not browser:
-                    logger.error(f"Failed to get browser: {browser_name}")
-                    return None
-                context = await self.create_context(browser, viewport, device_name=device_name, browser_name=browser_name, region=region)
-                page = await context.new_page()
-
-                if region:
+                context = await self._acquire_context(
+                    browser_name, viewport, device_name=device_name, region=region,
+                    block_third_party=block_third_party, block_resources=block_resources,
+                    storage_state_path=storage_state_path, run_id=run_id,
+                )
+                page, is_new_page = await self._get_page(context)
+
+                # Init scripts persist across navigations, so warm pages already have this
+                if region and is_new_page:
                     from config import REGIONS
                     region_config = REGIONS.get(region, {})
                     locale = region_config.get('locale', 'en-US')
@@ -411,58 +896,66 @@ class BrowserManager:
 
                 await self._navigate_to_url(page, url)
 
-                # Quick font loading check (non-blocking)
-                try:
-                    await page.evaluate("(async () => { if (document.fonts && document.fonts.ready) { try { await document.fonts.ready; } catch(e) {} } return true; })()")
-                except Exception:
-                    pass
-                
-                # Additional wait time for dynamic content
-                await asyncio.sleep(wait_time)
-                
-                # Remove any modal dialogs or cookie banners (common issue)
-                await self.handle_common_overlays(page)
+                # Wait for dynamic content, but only as long as the network stays busy.
+                # Pages with long-lived analytics connections never go idle, so both
+                # waits are bounded and a timeout still proceeds to capture.
+                loop = asyncio.get_running_loop()
+                settle_started = loop.time()
+                content_ready = False
+                if ready_selector:
+                    try:
+                        await page.wait_for_selector(ready_selector, state='visible', timeout=5000)
+                        content_ready = True
+                    except Exception:
+                        logger.info(f"Ready selector {ready_selector} not visible on {url}; waiting for network idle")
+                if not content_ready:
+                    try:
+                        await page.wait_for_load_state('load', timeout=BROWSER_LAUNCH.get('load_timeout_ms', 8000))
+                    except Exception:
+                        pass
+                    try:
+                        await page.wait_for_load_state('networkidle', timeout=max(1000, wait_time * 1000))
+                    except Exception:
+                        pass
+
+                # A page that reports ready instantly may still be hydrating client-side
+                if loop.time() - settle_started < INSTANT_READY_SECONDS:
+                    await asyncio.sleep(HYDRATION_BUFFER_SECONDS)
+                if force_wait > 0:
+                    await asyncio.sleep(force_wait)
+
+                # Fonts requested by late scripts/styles are only known once the network
+                # settles; cookie banners and modals are dismissed in the same evaluate
+                await self._prepare_page(page)
                 
-                # Capture runtime viewport metrics
-                metrics = None
-                try:
-                    metrics = await page.evaluate(
-                        "() => ({"
-                        " innerWidth: window.innerWidth,"
-                        " innerHeight: window.innerHeight,"
-                        " devicePixelRatio: window.devicePixelRatio,"
-                        " userAgent: navigator.userAgent,"
-                        " webdriver: navigator.webdriver,"
-                        " screen: { width: window.screen.width, height: window.screen.height }"
-                        " })"
-                    )
-                    logger.info(
-                        "Browser fingerprint for %s: ua=%s webdriver=%s",
-                        url,
-                        (metrics or {}).get('userAgent', '')[:80],
-                        (metrics or {}).get('webdriver'),
-                    )
-                except Exception:
-                    metrics = None
+                # Runtime viewport metrics recorded when the context was created
+                metrics = dict(getattr(context, '_vrt_metrics', {}))
 
                 # Take high-quality full page screenshot with better settings
-                screenshot_bytes = await page.screenshot(
-                    full_page=True, 
-                    type='png',
-                    animations='disabled',  # Disable animations for consistent screenshots
-                    caret='hide'  # Hide text cursor
-                )
+                screenshot_options = {
+                    'full_page': True,
+                    'animations': 'disabled',  # Disable animations for consistent screenshots
+                    'caret': 'hide',  # Hide text cursor
+                    'scale': 'css',  # One image pixel per CSS pixel, whatever the DPR
+                }
+                if screenshot_format == 'jpeg':
+                    screenshot_options.update(type='jpeg', quality=85)
+                else:
+                    screenshot_options['type'] = 'png'
+                screenshot_bytes = await self._capture_screenshot(page, browser_name, screenshot_options)
+                page_reusable = True
                 
-                # Convert to PIL Image and enhance quality
-                image = Image.open(io.BytesIO(screenshot_bytes))
+                # Decoding and enhancement are deferred until the image is compared
+                image = LazyImage(
+                    screenshot_bytes,
+                    format=screenshot_options['type'],
+                    transform=self._screenshot_transform,
+                    max_width=IMAGE_COMPARISON.get('max_compare_width'),
+                )
                 
                 # Log screenshot dimensions for debugging
                 logger.info(f"Screenshot captured: {image.size[0]}x{image.size[1]} for {url} on {browser_name} {device_name}")
                 
-                # Enhance image quality without forcing dimensions
-                image = self._enhance_screenshot_quality(image, viewport)
-                
-                await context.close()
                 if return_metrics:
                     return image, (metrics or {})
                 return image
@@ -473,24 +966,15 @@ class BrowserManager:
                 logger.error(f"Error taking screenshot of {url} with {browser_name} (region: {region}) on attempt {attempt + 1}: {e}")
                 logger.error(f"Error type: {error_type}")
                 
-                # Clean up context on error
-                if context is not None:
-                    try:
-                        await context.close()
-                    except Exception:
-                        pass
-                    context = None
+                # A closed target leaves the pooled context unusable; other errors only cost the page.
+                # The browser is shared with other captures and runs, so it is left open:
+                # get_browser relaunches it on the next attempt only if it actually disconnected.
+                if error_type == 'TargetClosedError' and context is not None:
+                    await self._discard_context(context)
                 
                 # Check if this is a TargetClosedError and we should retry
                 if error_type == 'TargetClosedError' and attempt < max_retries - 1:
                     logger.warning(f"Browser context was closed, retrying in 2 seconds... (attempt {attempt + 1}/{max_retries})")
-                    # Force browser recreation on next attempt
-                    if browser_name in self.browsers:
-                        try:
-                            await self.browsers[browser_name].close()
-                        except Exception:
-                            pass
-                        del self.browsers[browser_name]
                     await asyncio.sleep(2)  # Wait before retry
                     continue
                 else:
@@ -498,103 +982,234 @@ class BrowserManager:
                     import traceback
                     logger.error(f"Traceback: {traceback.format_exc()}")
                     break
+            finally:
+                if page is not None and page_reusable:
+                    await self._release_page(context, page)
+                elif page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
         
         # If we get here, all retries failed
         logger.error(f"Failed to take screenshot after {max_retries} attempts. Last error: {last_error}")
         return None
     
-    def _enhance_screenshot_quality(self, image, viewport):
+    async def _capture_screenshot(self, page, browser_name, screenshot_options):
+        """Capture a full-page screenshot, in one CDP call on Chromium browsers.
+
+        Playwright's full-page path resizes and scrolls the page; Chromium can
+        instead composite the whole document off-screen in one pass. Falls back
+        to ``page.screenshot`` for other engines or if the CDP call fails.
+        """
+        if browser_name in ('Chrome', 'Edge'):
+            try:
+                cdp = getattr(page, '_vrt_cdp', None)
+                if cdp is None:
+                    cdp = page._vrt_cdp = await page.context.new_cdp_session(page)
+                await page.evaluate(FREEZE_PAGE_SCRIPT)
+                layout = await cdp.send('Page.getLayoutMetrics')
+                content = layout.get('cssContentSize') or layout['contentSize']
+                scale = 1
+                if screenshot_options.get('scale') == 'css':
+                    dpr = getattr(page.context, '_vrt_metrics', {}).get('devicePixelRatio') or 1
+                    scale = 1 / dpr
+                params = {
+                    'format': screenshot_options.get('type', 'png'),
+                    'captureBeyondViewport': True,
+                    'fromSurface': True,
+                    'clip': {
+                        'x': 0,
+                        'y': 0,
+                        'width': content['width'],
+                        'height': content['height'],
+                        'scale': scale,
+                    },
+                }
+                if 'quality' in screenshot_options:
+                    params['quality'] = screenshot_options['quality']
+                result = await cdp.send('Page.captureScreenshot', params)
+                return base64.b64decode(result['data'])
+            except Exception as e:
+                page._vrt_cdp = None
+                logger.debug(f"CDP screenshot failed, using page.screenshot: {e}")
+        return await page.screenshot(**screenshot_options)
+
+    async def screenshot_many(self, jobs, concurrency=None):
+        """Run several take_screenshot jobs concurrently, bounded per browser.
+
+        Each job is a dict of take_screenshot keyword arguments. Results come
+        back in job order; a job that raised returns its exception. Passing
+        ``concurrency`` caps this batch as a whole instead of per browser.
+        """
+        batch_semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+
+        async def run_job(job):
+            # The limit is per browser process, which Edge may share with Chrome
+            browser_name = self._launch_name(job['browser_name'])
+            semaphore = batch_semaphore or self._page_semaphores.get(browser_name)
+            if semaphore is None:
+                semaphore = self._page_semaphores[browser_name] = asyncio.Semaphore(
+                    BROWSER_LAUNCH.get('max_concurrent_pages', 4)
+                )
+            async with semaphore:
+                return await self.take_screenshot(**job)
+
+        return await asyncio.gather(*(run_job(job) for job in jobs), return_exceptions=True)
+
+    def _enhance_screenshot_quality(self, image, viewport=None):
         """Enhance screenshot quality without forcing dimensions."""
         try:
-            from PIL import ImageEnhance, ImageFilter
-            
             # Convert to RGB if necessary
             if image.mode != 'RGB':
                 image = image.convert('RGB')
             
-            # Enhance sharpness for better clarity
-            enhancer = ImageEnhance.Sharpness(image)
-            image = enhancer.enhance(1.2)  # Slightly increase sharpness
-            
-            # Enhance contrast for better visibility
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(1.1)  # Slightly increase contrast
+            # Sharpness 1.2 then contrast 1.1, fused into one weighted sum:
+            #   sharp = 1.2 * img - 0.2 * smooth
+            #   out   = 1.1 * sharp - 0.1 * gray_mean
+            pixels = np.asarray(image)
+            smooth = cv2.filter2D(pixels, -1, _SMOOTH_KERNEL, borderType=cv2.BORDER_REPLICATE)
+            red, green, blue, _ = cv2.mean(pixels)
+            gray_mean = 0.299 * red + 0.587 * green + 0.114 * blue
+            enhanced = cv2.addWeighted(pixels, 1.32, smooth, -0.22, -0.1 * gray_mean)
             
             # For desktop screenshots, preserve the actual page dimensions
             # Only apply minimal quality enhancements without resizing
             # This prevents stretching and maintains the true site appearance
             
-            return image
+            return Image.fromarray(enhanced)
             
         except Exception as e:
             logger.warning(f"Error enhancing screenshot quality: {e}")
             return image  # Return original if enhancement fails
     
-    async def handle_common_overlays(self, page):
-        """Attempt to dismiss or hide common overlays to reduce visual noise."""
+    async def _prepare_page(self, page):
+        """Wait for fonts and dismiss overlays in a single evaluate; returns the page state."""
         try:
-            # Common selectors for cookie banners and overlays
-            overlay_selectors = [
-                '[data-testid="cookie-banner"]',
-                '.cookie-banner',
-                '.cookie-notice',
-                '.gdpr-banner',
-                '.modal-overlay',
-                '[role="dialog"]',
-                '.popup-overlay',
-                '#cookie-consent'
-            ]
-            
-            for selector in overlay_selectors:
-                try:
-                    await page.wait_for_selector(selector, timeout=1000)
-                    await page.evaluate(
-                        "(sel) => { const el = document.querySelector(sel); if (el) el.style.display = 'none'; }",
-                        selector
-                    )
-                except Exception:
-                    continue
-                    
-            # Try to click common "Accept" or "Close" buttons
-            accept_buttons = [
-                'button:has-text("Accept")',
-                'button:has-text("OK")',
-                'button:has-text("Close")',
-                'button:has-text("Got it")',
-                '[data-testid="accept-cookies"]'
-            ]
-            
-            for button_selector in accept_buttons:
-                try:
-                    await page.click(button_selector, timeout=1000)
-                    await asyncio.sleep(0.5)
-                except Exception:
-                    continue
-                    
+            state = await page.evaluate(PREPARE_PAGE_SCRIPT, _DISMISS_OVERLAYS_ARGS)
         except Exception as e:
-            # Ignore overlay handling errors as they're not critical
-            logger.debug(f"Overlay handling error: {e}")
-            pass
-    
+            logger.debug(f"Page preparation error: {e}")
+            return {}
+        if state.get('clicked'):
+            # Give dismiss handlers a moment to run
+            await asyncio.sleep(0.5)
+        logger.debug(f"Page ready: readyState={state.get('readyState')}, height={state.get('height')}")
+        return state
+
+    async def reset_contexts(self, run_id=None):
+        """Close one run's pooled contexts (all of them when ``run_id`` is None).
+
+        Contexts of other runs sharing this manager are left alone. A reset
+        ``run_id`` cannot pool new contexts afterwards.
+        """
+        if run_id is not None:
+            self._closed_runs.add(run_id)
+        keys = [key for key in {*self.contexts, *self._context_locks} if run_id is None or key[-1] == run_id]
+        for key in keys:
+            lock = self._context_locks.get(key)
+            if lock is not None:
+                # Wait out an _acquire_context already creating this key's context
+                async with lock:
+                    context = self.contexts.pop(key, None)
+            else:
+                context = self.contexts.pop(key, None)
+            self._context_locks.pop(key, None)
+            if context is None:
+                continue
+            self._page_pools.pop(context, None)
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    async def prelaunch(self, browser_names):
+        """Launch browsers ahead of the first capture; failures surface again on first use."""
+        launched = await asyncio.gather(
+            *(self.get_browser(name) for name in browser_names),
+            return_exceptions=True,
+        )
+        for name, browser in zip(browser_names, launched):
+            if isinstance(browser, BaseException):
+                logger.warning(f"Prelaunch of {name} failed: {browser}")
+
     async def cleanup(self):
         """Close browsers and stop Playwright if started."""
         try:
+            await self.reset_contexts()
+
             for browser in self.browsers.values():
                 await browser.close()
             
             if self.playwright:
-                await self.playwright.stop()
+                await self._release_playwright()
             
-            self.browsers = {}
+            self.browsers.clear()
             self.playwright = None
             
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
     
-    def __del__(self):
-        """Avoid event-loop operations during interpreter shutdown."""
-        try:
-            self.browsers = {}
-            self.playwright = None
-        except Exception:
-            pass
+    async def __aenter__(self):
+        """Start Playwright so the manager can be used as ``async with BrowserManager() as mgr``."""
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Close contexts and browsers and release Playwright."""
+        await self.cleanup()
+
+
+async def save_state(context, path):
+    """Write a logged-in context's cookies and storage to ``path`` for ``AUTH_STATES``."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return await context.storage_state(path=path)
+
+
+_browser_loop = None
+_browser_loop_guard = threading.Lock()
+
+
+def _get_browser_loop():
+    """Return the long-lived event loop that owns the shared manager's Playwright objects."""
+    global _browser_loop
+    with _browser_loop_guard:
+        if _browser_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='vrt-browser-loop', daemon=True).start()
+            _browser_loop = loop
+        return _browser_loop
+
+
+def submit_to_browser_loop(coro):
+    """Schedule ``coro`` on the browser loop and return a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_browser_loop())
+
+
+def run_in_browser_loop(coro):
+    """Run ``coro`` on the browser loop and block until it finishes."""
+    return submit_to_browser_loop(coro).result()
+
+
+@functools.lru_cache(maxsize=1)
+def get_manager():
+    """Process-wide BrowserManager whose browsers stay open between runs.
+
+    Playwright objects are bound to the loop that created them, so drive this
+    manager only through ``run_in_browser_loop``/``submit_to_browser_loop``.
+    Its browsers are closed at interpreter exit.
+    """
+    manager = BrowserManager()
+    atexit.register(_close_shared_manager, manager)
+    return manager
+
+
+def _close_shared_manager(manager):
+    """atexit hook: close the shared manager's browsers on the loop that owns them."""
+    if not manager.browsers or _browser_loop is None or not _browser_loop.is_running():
+        return
+    try:
+        submit_to_browser_loop(manager.cleanup()).result(timeout=15)
+    except Exception as e:
+        logger.warning(f"Error closing shared browsers at exit: {e}")
@@ -18,6 +18,7 @@ if str(ROOT) not in sys.path:
 from ci.runner import run_test_matrix
 from config import BROWSERS, DEVICES, REGIONS
 from reports.generator import generate_html_report, write_pdf_report
+from utils import summarize_results
 
 logging.basicConfig(
     level=logging.INFO,
@@ -178,9 +179,8 @@ def main():
             ),
         )
 
-        passed = sum(1 for r in results if r.get('is_match') and not r.get('is_skipped', False))
-        failed = sum(1 for r in results if not r.get('is_match') and not r.get('is_skipped', False))
-        skipped = sum(1 for r in results if r.get('is_skipped', False))
+        summary = summarize_results(results)
+        passed, failed, skipped = summary['passed'], summary['failed'], summary['skipped']
         logger.info("Finished: %s total, %s passed, %s failed, %s skipped", len(results), passed, failed, skipped)
 
         pdf_name = 'report-summary.pdf' if args.summary_pdf_only else 'report-full.pdf'
@@ -4,31 +4,44 @@ import logging
 from datetime import datetime
 
 from browser_automation import BrowserManager
-from config import PLAYWRIGHT_DEVICE_MAP, VIEWPORT_CONFIGS
-from image_comparison import ImageComparator
-from ui.helpers import build_skipped_result
+from config import DEFAULT_SETTINGS, PLAYWRIGHT_DEVICE_MAP, VIEWPORT_CONFIGS
+from ui.helpers import build_skipped_result, compare_captures, warm_test_origins
 from utils import validate_url_pairs
 
 logger = logging.getLogger(__name__)
 
 
-async def run_single_test(url_pair, browser, device, similarity_threshold, wait_time, selected_region):
-    """Run one visual regression test and return a result dict."""
-    browser_manager = None
+async def run_single_test(url_pair, browser, device, similarity_threshold, wait_time, selected_region,
+                          browser_manager=None):
+    """Run one visual regression test and return a result dict.
+
+    Pass a shared ``browser_manager`` to reuse its browsers; otherwise a
+    private one is created and closed after the test.
+    """
+    owns_manager = browser_manager is None
     try:
-        browser_manager = BrowserManager()
+        if owns_manager:
+            browser_manager = BrowserManager()
         viewport = VIEWPORT_CONFIGS[device]
         region = selected_region if selected_region != "Default" else None
         logger.info("Capturing %s (%s, %s) region=%s", url_pair['name'], browser, device, region)
 
-        staging_capture = await browser_manager.take_screenshot(
-            url_pair['staging_url'], browser, viewport, wait_time,
-            device_name=device, return_metrics=True, region=region,
-        )
-        production_capture = await browser_manager.take_screenshot(
-            url_pair['production_url'], browser, viewport, wait_time,
-            device_name=device, return_metrics=True, region=region,
-        )
+        # Staging and production are independent page loads; capture them concurrently
+        capture_options = {
+            'browser_name': browser, 'viewport': viewport, 'wait_time': wait_time,
+            'device_name': device, 'return_metrics': True, 'region': region,
+            'screenshot_format': DEFAULT_SETTINGS['screenshot_format'],
+        }
+        staging_capture, production_capture = await browser_manager.screenshot_many([
+            {'url': url_pair['staging_url'], **capture_options},
+            {'url': url_pair['production_url'], **capture_options},
+        ])
+        if isinstance(staging_capture, BaseException):
+            logger.error("Staging capture raised: %s", staging_capture)
+            staging_capture = None
+        if isinstance(production_capture, BaseException):
+            logger.error("Production capture raised: %s", production_capture)
+            production_capture = None
 
         staging_screenshot, staging_metrics = (
             staging_capture if isinstance(staging_capture, tuple) else (staging_capture, {})
@@ -41,9 +54,12 @@ async def run_single_test(url_pair, browser, device, similarity_threshold, wait_
             logger.warning("Screenshot capture failed for %s (%s, %s)", url_pair['name'], browser, device)
             return None
 
-        comparison_result = ImageComparator().compare_images(
+        compared = await asyncio.get_running_loop().run_in_executor(
+            None,
+            compare_captures,
             staging_screenshot, production_screenshot, similarity_threshold,
         )
+        comparison_result = compared['comparison']
 
         return {
             'test_name': url_pair['name'],
@@ -54,8 +70,8 @@ async def run_single_test(url_pair, browser, device, similarity_threshold, wait_
             'production_url': url_pair['production_url'],
             'similarity_score': comparison_result['similarity_score'],
             'is_match': comparison_result['is_match'],
-            'staging_screenshot': staging_screenshot,
-            'production_screenshot': production_screenshot,
+            'staging_screenshot': compared['staging_screenshot'],
+            'production_screenshot': compared['production_screenshot'],
             'diff_image': comparison_result['diff_image'],
             'timestamp': datetime.now().isoformat(),
             'viewport_width': viewport.get('width'),
@@ -68,7 +84,7 @@ async def run_single_test(url_pair, browser, device, similarity_threshold, wait_
         logger.error("Error in test %s (%s, %s): %s", url_pair['name'], browser, device, e)
         return None
     finally:
-        if browser_manager is not None:
+        if owns_manager and browser_manager is not None:
             try:
                 await browser_manager.cleanup()
             except Exception as cleanup_error:
@@ -91,17 +107,22 @@ async def run_test_matrix(url_pairs, browsers, devices, similarity_threshold, wa
     total = len(url_pairs) * len(browsers) * len(devices)
     current = 0
 
-    for url_pair in url_pairs:
-        for browser in browsers:
-            for device in devices:
-                current += 1
-                logger.info("Running test %s/%s: %s %s %s", current, total, url_pair['name'], browser, device)
-                result = await run_single_test(
-                    url_pair, browser, device, similarity_threshold, wait_time, selected_region,
-                )
-                if result:
-                    results.append(result)
-                else:
-                    results.append(build_skipped_result(url_pair, browser, device, selected_region))
+    # One manager for the whole matrix: each browser launches once, not per test
+    async with BrowserManager() as browser_manager:
+        await browser_manager.prelaunch(list(browsers))
+        await warm_test_origins(browser_manager, url_pairs, browsers, devices, selected_region)
+        for url_pair in url_pairs:
+            for browser in browsers:
+                for device in devices:
+                    current += 1
+                    logger.info("Running test %s/%s: %s %s %s", current, total, url_pair['name'], browser, device)
+                    result = await run_single_test(
+                        url_pair, browser, device, similarity_threshold, wait_time, selected_region,
+                        browser_manager=browser_manager,
+                    )
+                    if result:
+                        results.append(result)
+                    else:
+                        results.append(build_skipped_result(url_pair, browser, device, selected_region))
 
     return results
@@ -168,6 +168,14 @@ DEFAULT_SETTINGS = {
     'timeout': 45000,
     'full_page_screenshot': True,
     'ignore_https_errors': os.environ.get('IGNORE_HTTPS_ERRORS', 'true').lower() in ('true', '1', 'yes'),
+    # Sharpen/contrast captures before comparing; off keeps screenshots exactly as rendered
+    'enhance_screenshots': os.environ.get('VRT_ENHANCE', 'false').lower() in ('true', '1', 'yes'),
+    # Desktop device pixel ratio. 2 renders sharper text but quadruples pixels to encode,
+    # store, and compare; screenshots are taken at CSS scale either way.
+    'device_scale_factor': float(os.environ.get('VRT_DEVICE_SCALE_FACTOR', '1')),
+    # Capture encoding: 'jpeg' (quality 85) encodes and decodes several times faster than
+    # 'png' and compares fine at that quality; keep 'png' when pixel-exact diffs matter.
+    'screenshot_format': os.environ.get('VRT_SCREENSHOT_FORMAT', 'png').lower(),
 }
 
 # Browser launch / anti-bot settings (Cloudflare-friendly defaults)
@@ -178,14 +186,73 @@ BROWSER_LAUNCH = {
     'headless': os.environ.get('PLAYWRIGHT_HEADLESS', 'true').lower() in ('true', '1', 'yes'),
     # Extra wait while Cloudflare interstitials resolve
     'cloudflare_wait_seconds': int(os.environ.get('CLOUDFLARE_WAIT_SECONDS', '20')),
-    'navigation_timeout_ms': int(os.environ.get('PLAYWRIGHT_NAVIGATION_TIMEOUT_MS', '45000')),
+    # Budget for DOMContentLoaded; later readiness waits are separately bounded
+    'navigation_timeout_ms': int(os.environ.get('PLAYWRIGHT_NAVIGATION_TIMEOUT_MS', '15000')),
+    'load_timeout_ms': int(os.environ.get('PLAYWRIGHT_LOAD_TIMEOUT_MS', '8000')),
+    # Concurrent pages per browser in screenshot_many; more mostly queues in the screenshot pipeline
+    'max_concurrent_pages': max(1, int(os.environ.get('PLAYWRIGHT_MAX_PAGES', '4'))),
+    # WebSocket URL of a shared Chromium (see supervisor.py); Chrome/Edge connect instead of launching
+    'cdp_endpoint': os.environ.get('PLAYWRIGHT_CDP_WS', '').strip() or None,
+    # Abort analytics/ad requests and media streams during captures (PLAYWRIGHT_BLOCK_THIRD_PARTY=false to load everything)
+    'block_third_party': os.environ.get('PLAYWRIGHT_BLOCK_THIRD_PARTY', 'true').lower() in ('true', '1', 'yes'),
+    # Edge renders with the same engine as Chrome, so by default it shares Chrome's browser
+    # and differs only by user agent; set true to launch the real msedge binary
+    'use_edge_channel': os.environ.get('PLAYWRIGHT_USE_EDGE_CHANNEL', 'false').lower() in ('true', '1', 'yes'),
 }
 
+# Opt-in resource-type blocking for captures that only check layout. 'layout' keeps images
+# and stylesheets so structure still renders; 'fast' drops them too for quick smoke checks.
+RESOURCE_BLOCK_MODES = {
+    'layout': ('media', 'font', 'websocket', 'other'),
+    'fast': ('media', 'font', 'websocket', 'other', 'image', 'stylesheet'),
+}
+
+# Saved Playwright storageState files (cookies + localStorage) per host, so logged-in sites
+# skip re-authenticating. Capture one with browser_automation.save_state(context, path).
+# VRT_AUTH_STATES="staging.example.com=auth/staging.json,www.example.com=auth/prod.json"
+AUTH_STATES = dict(
+    entry.strip().split('=', 1)
+    for entry in os.environ.get('VRT_AUTH_STATES', '').split(',')
+    if '=' in entry
+)
+
+# CSS selector per host marking the main content as rendered. When it becomes visible the
+# capture proceeds without waiting for network idle.
+# VRT_READY_SELECTORS="www.example.com=#main;shop.example.com=.product-grid"
+READY_SELECTORS = dict(
+    entry.strip().split('=', 1)
+    for entry in os.environ.get('VRT_READY_SELECTORS', '').split(';')
+    if '=' in entry
+)
+
+# Chromium-only flags that cut background work during capture runs. Playwright adds some
+# of these itself; they matter for browsers started outside it (see supervisor.py).
+CHROMIUM_LAUNCH_ARGS = (
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-sync',
+    '--disable-default-apps',
+    '--disable-translate',
+    '--disable-renderer-backgrounding',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-hang-monitor',
+    '--disable-component-update',
+    '--disable-breakpad',
+    '--metrics-recording-only',
+    '--mute-audio',
+)
+
 # Image comparison settings
 IMAGE_COMPARISON = {
     'difference_threshold': 30,  # Minimum pixel difference to be considered significant
     'blur_radius': 0.5,  # Optional blur to reduce noise
-    'similarity_metrics': ['ssim', 'pixel_similarity', 'histogram_similarity']
+    'similarity_metrics': ['ssim', 'pixel_similarity', 'histogram_similarity'],
+    # Downscale captures wider than this before comparing (0 = full resolution). 960 cuts
+    # comparison work ~4x for desktop pages but can miss hairline (1px) differences.
+    'max_compare_width': int(os.environ.get('VRT_MAX_COMPARE_WIDTH', '0')),
+    # Longest side the similarity metrics run at (0 = full resolution); diff images stay
+    # full size. 1024 makes scoring ~16x cheaper on 4K captures but blurs small changes.
+    'metrics_max_dimension': int(os.environ.get('VRT_METRICS_MAX_DIMENSION', '0')),
 }
 
 # Results storage settings
@@ -194,8 +261,13 @@ RESULTS_CONFIG = {
     'screenshots_directory': 'screenshots',
     'max_filename_length': 100,
     'cleanup_days': 30,
-    'image_format': 'PNG',
-    'image_quality': 95
+    # Staging/production screenshot format: PNG writes captures as-is; WEBP re-encodes them
+    # losslessly (~25% smaller on typical pages, ~0.25s extra per 1920x6000 capture)
+    'image_format': os.environ.get('VRT_IMAGE_FORMAT', 'PNG').upper(),
+    'image_quality': 95,
+    # zlib level for PNGs encoded on save (diff images, enhanced captures); 1 is ~1.5x faster
+    # than the default 6 for files ~20% larger
+    'png_compress_level': int(os.environ.get('VRT_PNG_COMPRESS_LEVEL', '1')),
 }
 
 # UI Configuration
@@ -207,33 +279,32 @@ UI_CONFIG = {
     'max_upload_size': 10  # MB
 }
 
-# Common overlays and elements to handle
-OVERLAY_SELECTORS = [
-    '[data-testid="cookie-banner"]',
-    '.cookie-banner',
-    '.cookie-notice',
-    '.cookie-consent',
-    '.gdpr-banner',
-    '.modal-overlay',
-    '[role="dialog"]',
-    '.popup-overlay',
-    '#cookie-consent',
-    '.privacy-banner',
-    '.notification-banner'
-]
-
-# Common accept/close button selectors
-ACCEPT_BUTTON_SELECTORS = [
-    'button:has-text("Accept")',
-    'button:has-text("Accept All")',
-    'button:has-text("OK")',
-    'button:has-text("Close")',
-    'button:has-text("Got it")',
-    'button:has-text("Dismiss")',
-    '[data-testid="accept-cookies"]',
-    '[data-testid="close-modal"]',
-    '.accept-button',
-    '.close-button'
+# Analytics, ad, and session-recording hosts blocked when block_third_party is on.
+# Subdomains match too; fonts and CDNs are left alone since they affect rendering.
+THIRD_PARTY_BLOCKLIST = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'adservice.google.com',
+    'amazon-adsystem.com',
+    'facebook.net',
+    'hotjar.com',
+    'segment.io',
+    'segment.com',
+    'intercom.io',
+    'intercomcdn.com',
+    'mixpanel.com',
+    'fullstory.com',
+    'clarity.ms',
+    'nr-data.net',
+    'bat.bing.com',
+    'ads.linkedin.com',
+    'ads-twitter.com',
+    'criteo.com',
+    'taboola.com',
+    'outbrain.com',
 ]
 
 # Error messages
@@ -5,13 +5,68 @@ metrics (SSIM, pixel similarity, histogram correlation) and can generate
 overlay and difference images for analysis.
 """
 import numpy as np
-from PIL import Image, ImageChops
+from PIL import Image
 import cv2
-from skimage.metrics import structural_similarity as ssim
 import logging
 
+from config import IMAGE_COMPARISON
+
 logger = logging.getLogger(__name__)
 
+# SSIM window (pixels per side) and stability constants, matching scikit-image's defaults
+SSIM_WINDOW = 7
+SSIM_K1 = 0.01
+SSIM_K2 = 0.03
+
+
+def _to_padded_rgb_array(image, height, width):
+    """RGB uint8 array of ``image`` on a white ``height`` x ``width`` canvas, top-left aligned."""
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    array = np.asarray(image)
+    if array.shape[:2] == (height, width):
+        return array
+    canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+    canvas[:array.shape[0], :array.shape[1]] = array
+    return canvas
+
+
+def _ssim(gray1, gray2, data_range):
+    """Mean SSIM from box-filtered local statistics.
+
+    Equivalent to ``skimage.metrics.structural_similarity`` with its default
+    7x7 uniform window and sample covariance, but each local mean/variance is
+    a single vectorized ``cv2.blur`` pass instead of per-window work.
+    """
+    if min(gray1.shape[:2]) < SSIM_WINDOW:
+        # Too small for a single window
+        return 1.0 if np.array_equal(gray1, gray2) else 0.0
+    x = gray1.astype(np.float32)
+    y = gray2.astype(np.float32)
+    window = (SSIM_WINDOW, SSIM_WINDOW)
+
+    mu_x = cv2.blur(x, window, borderType=cv2.BORDER_REFLECT)
+    mu_y = cv2.blur(y, window, borderType=cv2.BORDER_REFLECT)
+    mu_xx = cv2.blur(x * x, window, borderType=cv2.BORDER_REFLECT)
+    mu_yy = cv2.blur(y * y, window, borderType=cv2.BORDER_REFLECT)
+    mu_xy = cv2.blur(x * y, window, borderType=cv2.BORDER_REFLECT)
+
+    n = SSIM_WINDOW * SSIM_WINDOW
+    cov_norm = n / (n - 1)
+    var_x = cov_norm * (mu_xx - mu_x * mu_x)
+    var_y = cov_norm * (mu_yy - mu_y * mu_y)
+    cov_xy = cov_norm * (mu_xy - mu_x * mu_y)
+
+    c1 = (SSIM_K1 * data_range) ** 2
+    c2 = (SSIM_K2 * data_range) ** 2
+    ssim_map = ((2 * mu_x * mu_y + c1) * (2 * cov_xy + c2)) / (
+        (mu_x * mu_x + mu_y * mu_y + c1) * (var_x + var_y + c2)
+    )
+
+    # Skip the border where the window hangs off the image
+    pad = (SSIM_WINDOW - 1) // 2
+    return float(ssim_map[pad:-pad, pad:-pad].mean(dtype=np.float64))
+
 class ImageComparator:
     """Compare images and produce similarity scores and visual artifacts."""
     def __init__(self):
@@ -32,15 +87,29 @@ class ImageComparator:
             threshold = self.default_threshold
         
         try:
-            # Ensure images are the same size
-            image1, image2 = self.resize_images_to_match(image1, image2)
+            # Pad both to a shared canvas once; every metric and the diff reuse these arrays
+            width = max(image1.size[0], image2.size[0])
+            height = max(image1.size[1], image2.size[1])
+            img1_np = _to_padded_rgb_array(image1, height, width)
+            img2_np = _to_padded_rgb_array(image2, height, width)
             
-            # Convert to numpy arrays
-            img1_np = np.array(image1)
-            img2_np = np.array(image2)
+            # Byte-identical captures score 100 on every metric; skip SSIM and histograms
+            if cv2.norm(img1_np, img2_np, cv2.NORM_L1) == 0:
+                return {
+                    'similarity_score': 100.0,
+                    'is_match': True,
+                    'diff_image': None,
+                    'detailed_scores': {
+                        'ssim': 100.0,
+                        'pixel_similarity': 100.0,
+                        'histogram_similarity': 100.0,
+                    },
+                }
             
             # Calculate multiple similarity metrics
-            similarity_scores = self.calculate_similarity_metrics(img1_np, img2_np)
+            similarity_scores = self.calculate_similarity_metrics(
+                *self.downsample_for_metrics(img1_np, img2_np)
+            )
             
             # Use the average of different similarity metrics
             final_score = np.mean([
@@ -53,7 +122,7 @@ class ImageComparator:
             is_match = final_score >= (threshold / 100.0)
             
             # Generate difference image
-            diff_image = self.create_difference_image(image1, image2) if not is_match else None
+            diff_image = self._difference_image(img1_np, img2_np) if not is_match else None
             
             return {
                 'similarity_score': final_score * 100,
@@ -100,6 +169,24 @@ class ImageComparator:
         
         return image1, image2
     
+    def downsample_for_metrics(self, img1_np, img2_np, max_dimension=None):
+        """Shrink matched arrays so their longest side is at most ``max_dimension``.
+
+        Defaults to ``IMAGE_COMPARISON['metrics_max_dimension']``; 0 leaves
+        the arrays untouched.
+        """
+        if max_dimension is None:
+            max_dimension = IMAGE_COMPARISON.get('metrics_max_dimension', 0)
+        height, width = img1_np.shape[:2]
+        if not max_dimension or max(height, width) <= max_dimension:
+            return img1_np, img2_np
+        scale = max_dimension / max(height, width)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return (
+            cv2.resize(img1_np, size, interpolation=cv2.INTER_AREA),
+            cv2.resize(img2_np, size, interpolation=cv2.INTER_AREA),
+        )
+
     def calculate_similarity_metrics(self, img1_np, img2_np):
         """Calculate SSIM, pixel similarity, and histogram correlation."""
         # Ensure images are the same shape
@@ -120,11 +207,15 @@ class ImageComparator:
             # If both images are constant, SSIM is 1.0 when equal, else 0.0
             ssim_score = 1.0 if np.array_equal(gray1, gray2) else 0.0
         else:
-            ssim_score = ssim(gray1, gray2, data_range=data_range)
+            ssim_score = _ssim(gray1, gray2, data_range)
         
-        # Pixel-wise similarity
-        pixel_diff = np.abs(img1_np.astype(float) - img2_np.astype(float))
-        pixel_similarity = 1.0 - (np.mean(pixel_diff) / 255.0)
+        # Pixel-wise similarity; uint8 stays in OpenCV's sum-of-absolute-differences kernel
+        if img1_np.dtype == np.uint8 and img2_np.dtype == np.uint8:
+            diff_sum = cv2.norm(img1_np, img2_np, cv2.NORM_L1)
+            pixel_similarity = 1.0 - diff_sum / (img1_np.size * 255.0)
+        else:
+            pixel_diff = np.abs(img1_np.astype(float) - img2_np.astype(float))
+            pixel_similarity = 1.0 - (np.mean(pixel_diff) / 255.0)
         
         # Histogram similarity
         hist_similarity = self.calculate_histogram_similarity(img1_np, img2_np)
@@ -163,33 +254,32 @@ class ImageComparator:
     def create_difference_image(self, image1, image2):
         """Create a red-highlighted image emphasizing changed regions."""
         try:
-            # Ensure images are the same size
-            image1, image2 = self.resize_images_to_match(image1, image2)
-            
+            width = max(image1.size[0], image2.size[0])
+            height = max(image1.size[1], image2.size[1])
+            return self._difference_image(
+                _to_padded_rgb_array(image1, height, width),
+                _to_padded_rgb_array(image2, height, width),
+            )
+        except Exception as e:
+            logger.error(f"Error creating difference image: {e}")
+            return None
+
+    def _difference_image(self, img1_np, img2_np):
+        """Difference image from two same-shape RGB uint8 arrays."""
+        try:
             # Calculate pixel differences
-            diff = ImageChops.difference(image1, image2)
-            
-            # Convert to numpy array for processing
-            diff_np = np.array(diff)
+            diff_np = cv2.absdiff(img1_np, img2_np)
             
             # Create a more visible difference image
             # Convert to grayscale for threshold calculation
             gray_diff = cv2.cvtColor(diff_np, cv2.COLOR_RGB2GRAY)
             
             # Apply threshold to identify significant differences
-            _, thresh = cv2.threshold(gray_diff, 30, 255, cv2.THRESH_BINARY)
-            
-            # Create colored difference image
-            colored_diff = np.zeros_like(diff_np)
+            mask = gray_diff > 30
             
-            # Color significant differences in red
-            mask = thresh > 0
-            colored_diff[mask] = [255, 0, 0]  # Red for differences
-            
-            # Blend with original images for context
-            alpha = 0.7
-            base_image = np.array(image1)
-            blended = (alpha * base_image + (1 - alpha) * colored_diff).astype(np.uint8)
+            # Dim the staging image for context; changed pixels are overwritten below,
+            # so only the unchanged ones ever needed blending
+            blended = cv2.convertScaleAbs(img1_np, alpha=0.7)
             
             # Add red highlighting where there are differences
             blended[mask] = [255, 100, 100]  # Light red for differences
@@ -204,24 +294,21 @@ class ImageComparator:
         """Create an alpha-blended overlay of the two images."""
         try:
             # Ensure images are the same size
-            image1, image2 = self.resize_images_to_match(image1, image2)
-            
-            # Convert to RGBA for transparency
-            img1_rgba = image1.convert('RGBA')
-            img2_rgba = image2.convert('RGBA')
-            
-            # Apply opacity to the first image
-            img1_with_opacity = Image.new('RGBA', img1_rgba.size)
-            img1_with_opacity = Image.blend(
-                Image.new('RGBA', img1_rgba.size, (255, 255, 255, 0)),
-                img1_rgba,
-                opacity
-            )
+            width = max(image1.size[0], image2.size[0])
+            height = max(image1.size[1], image2.size[1])
+            img1_np = _to_padded_rgb_array(image1, height, width)
+            img2_np = _to_padded_rgb_array(image2, height, width)
             
-            # Composite the images
-            overlay = Image.alpha_composite(img2_rgba, img1_with_opacity)
+            # image1 is faded towards white at ``opacity`` and composited over image2
+            # with the same alpha, which collapses to one weighted sum:
+            # o*(o*a + (1-o)*255) + (1-o)*b = o²*a + (1-o)*b + o*(1-o)*255
+            overlay = cv2.addWeighted(
+                img1_np, opacity * opacity,
+                img2_np, 1 - opacity,
+                opacity * (1 - opacity) * 255,
+            )
             
-            return overlay.convert('RGB')
+            return Image.fromarray(overlay)
             
         except Exception as e:
             logger.error(f"Error creating overlay image: {e}")
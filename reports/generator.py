@@ -20,6 +20,13 @@ except ImportError:
     PDF_OK = False
     A4 = canvas = cm = ImageReader = None
 
+# Result image key -> key in the saved record's screenshot_paths
+_PATH_KEYS = {
+    'staging_screenshot': 'staging',
+    'production_screenshot': 'production',
+    'diff_image': 'diff',
+}
+
 
 def build_report_filename(results, run_id, summary_only=True):
     """Build a sanitized PDF filename from results metadata."""
@@ -44,12 +51,7 @@ def _load_result_image(record, which, results_base=None):
     if img is not None:
         return img
 
-    path_key = {
-        'staging_screenshot': 'staging',
-        'production_screenshot': 'production',
-        'diff_image': 'diff',
-    }.get(which, '')
-    rel = record.get('screenshot_paths', {}).get(path_key)
+    rel = record.get('screenshot_paths', {}).get(_PATH_KEYS.get(which, ''))
     if rel and results_base is not None:
         fp = safe_results_path(results_base, rel)
         try:
@@ -4,26 +4,139 @@ This module provides `ResultManager`, which persists per-test metadata and
 associated screenshots to a filesystem structure under `test_results/`.
 It also offers utilities to list runs, compute summaries, and perform cleanup.
 """
+import hashlib
+import io
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import logging
 from typing import Dict, List, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from PIL import Image
+
+from config import RESULTS_CONFIG
 from utils import enrich_test_result
 
 logger = logging.getLogger(__name__)
 
+
+def _dumps(data: Any) -> bytes:
+    """Compact JSON bytes; result files are read by code far more often than by people."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def format_for_display(data: Any) -> str:
+    """Pretty-print a stored result (or any JSON-able value) for reading or logging."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2)
+
+
+def _dump_json(path: Path, data: Any) -> None:
+    """Write ``data`` as JSON atomically: readers never see a half-written file."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(_dumps(data))
+    os.replace(tmp_path, path)
+
+
+def _load_json(path: Path) -> Any:
+    """Parse a JSON file, using orjson when it is installed."""
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _try_load_json(path) -> Any:
+    """``_load_json`` that returns the exception instead of raising, for pool fan-out."""
+    try:
+        return _load_json(Path(path))
+    except Exception as e:
+        return e
+
+
+def _load_json_files(paths) -> List[Any]:
+    """Read and parse many JSON files on ``_LOAD_POOL``; failed files yield their exception.
+
+    Files are handed out in a few contiguous batches rather than one task per file, so
+    cached reads cost no more than a plain loop while cold or network reads overlap.
+    """
+    paths = list(paths)
+    if len(paths) < 2 * _LOAD_WORKERS:
+        return [_try_load_json(path) for path in paths]
+    size = -(-len(paths) // _LOAD_WORKERS)
+    batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+    loaded = _LOAD_POOL.map(lambda batch: [_try_load_json(path) for path in batch], batches)
+    return [data for batch in loaded for data in batch]
+
+
+def _iter_json_files(directory: str):
+    """Yield paths of ``.json`` files under ``directory`` using scandir's cached entry types."""
+    with os.scandir(directory) as entries:
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.endswith('.json'):
+                yield entry.path
+    for subdir in subdirs:
+        yield from _iter_json_files(subdir)
+
+
+def _dumps_line(data: Any) -> bytes:
+    """Compact JSON plus newline for append-only ``.jsonl`` files."""
+    return _dumps(data) + b"\n"
+
+
+def _latest_timestamp(timestamps) -> Any:
+    """Latest of some ISO timestamps, normalized via ``isoformat``; None if none parse."""
+    latest = None
+    for value in timestamps:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            continue
+        if latest is None or parsed > latest:
+            latest = parsed
+    return latest.isoformat() if latest else None
+
+
+# Shared by all managers; image saves are short-lived and mostly zlib/disk bound
+_SAVE_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 2), thread_name_prefix='result-save')
+
+# Separate from saves so listing a run never queues behind image encodes; file reads
+# and (or)json parsing of small files release the GIL often enough to overlap
+_LOAD_WORKERS = 8
+_LOAD_POOL = ThreadPoolExecutor(max_workers=_LOAD_WORKERS, thread_name_prefix='result-load')
+
+
+# Fields copied from each saved result into the run index
+INDEX_FIELDS = ('timestamp', 'browser', 'device', 'similarity_score', 'is_match', 'is_skipped')
+
+# Shared by every ResultManager: a prune rewriting the index must not drop a concurrent append
+_INDEX_LOCK = threading.Lock()
+
+
 class ResultManager:
     """Manage persistence of test results and screenshots on disk.
 
     Directory layout per run: `test_results/<test_id>/<browser>/<device>/`.
-    Stores JSON metadata and PNG images; exposes helpers to save, load, list,
+    Stores JSON metadata and PNG (or lossless WebP) images; exposes helpers to save, load, list,
     summarize, delete, and clean up old runs.
     """
     def __init__(self, results_dir="test_results"):
         self.results_dir = Path(results_dir)
         self.results_dir.mkdir(exist_ok=True)
+        # One line per saved result so listing runs does not open every result file
+        self.index_file = self.results_dir / "_index.jsonl"
         # Screenshots are stored inside each test run directory; no global screenshots dir needed
     
     def save_result(self, test_id: str, result: Dict[str, Any]) -> bool:
@@ -38,6 +151,7 @@ class ResultManager:
             
             # Save screenshots
             screenshot_paths = self._save_screenshots(device_dir, result)
+            result['screenshot_paths'] = screenshot_paths
             
             # Create result metadata (without binary data) - ensure JSON serializable
             result_metadata = {
@@ -72,8 +186,8 @@ class ResultManager:
             
             # Save metadata to JSON
             result_file = device_dir / f"{self._generate_result_filename(result)}.json"
-            with open(result_file, 'w') as f:
-                json.dump(result_metadata, f, indent=2)
+            _dump_json(result_file, result_metadata)
+            self._append_index(test_id, result_metadata)
             
             logger.info(f"Saved result for {result['test_name']} - {result['browser']} ({result['device']})")
             return True
@@ -82,6 +196,52 @@ class ResultManager:
             logger.error(f"Error saving result: {e}")
             return False
     
+    def _append_index(self, test_id: str, result_metadata: Dict[str, Any]) -> None:
+        """Record a saved result in the run index."""
+        entry = {'test_id': test_id}
+        entry.update((field, result_metadata[field]) for field in INDEX_FIELDS if field in result_metadata)
+        try:
+            with _INDEX_LOCK, open(self.index_file, 'ab') as f:
+                f.write(_dumps_line(entry))
+        except OSError as e:
+            logger.warning(f"Could not update results index: {e}")
+
+    def _read_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Index entries grouped by test id; empty if there is no index yet."""
+        runs: Dict[str, List[Dict[str, Any]]] = {}
+        try:
+            with open(self.index_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = orjson.loads(line) if orjson is not None else json.loads(line)
+                    except ValueError:
+                        continue  # torn line from an interrupted write
+                    runs.setdefault(entry.get('test_id'), []).append(entry)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not read results index: {e}")
+        return runs
+
+    def _prune_index(self) -> None:
+        """Drop index entries for runs whose directories no longer exist."""
+        with _INDEX_LOCK:
+            runs = self._read_index()
+            kept = [
+                entry
+                for test_id, entries in runs.items()
+                if test_id and (self.results_dir / test_id).is_dir()
+                for entry in entries
+            ]
+            try:
+                tmp_path = self.index_file.with_name(f".{self.index_file.name}.tmp")
+                tmp_path.write_bytes(b"".join(_dumps_line(entry) for entry in kept))
+                os.replace(tmp_path, self.index_file)
+            except OSError as e:
+                logger.warning(f"Could not rewrite results index: {e}")
+
     def _save_screenshots(self, base_dir: Path, result: Dict[str, Any]) -> Dict[str, str]:
         """Save screenshots and return their paths"""
         screenshot_paths = {}
@@ -90,38 +250,70 @@ class ResultManager:
             # Generate filename base
             filename_base = self._generate_result_filename(result)
             
-            # Save staging screenshot
-            if result.get('staging_screenshot'):
-                staging_path = base_dir / f"{filename_base}_staging.png"
-                result['staging_screenshot'].save(staging_path)
-                screenshot_paths['staging'] = str(staging_path.relative_to(self.results_dir))
+            # Encoding and writing release the GIL, so the images are saved concurrently
+            pending = {}
+            suffix = '.webp' if RESULTS_CONFIG.get('image_format') == 'WEBP' else '.png'
+            
+            # Save staging screenshot (already-encoded PNG bytes are written as-is)
+            if result.get('staging_screenshot_bytes') or result.get('staging_screenshot'):
+                staging_path = base_dir / f"{filename_base}_staging{suffix}"
+                pending['staging'] = (staging_path, _SAVE_POOL.submit(
+                    self._write_image, staging_path, result, 'staging_screenshot',
+                ))
             
             # Save production screenshot
-            if result.get('production_screenshot'):
-                production_path = base_dir / f"{filename_base}_production.png"
-                result['production_screenshot'].save(production_path)
-                screenshot_paths['production'] = str(production_path.relative_to(self.results_dir))
+            if result.get('production_screenshot_bytes') or result.get('production_screenshot'):
+                production_path = base_dir / f"{filename_base}_production{suffix}"
+                pending['production'] = (production_path, _SAVE_POOL.submit(
+                    self._write_image, production_path, result, 'production_screenshot',
+                ))
             
             # Save diff image if available
             if result.get('diff_image'):
                 diff_path = base_dir / f"{filename_base}_diff.png"
-                result['diff_image'].save(diff_path)
-                screenshot_paths['diff'] = str(diff_path.relative_to(self.results_dir))
+                pending['diff'] = (diff_path, _SAVE_POOL.submit(self._save_image, diff_path, result['diff_image']))
+            
+            for kind, (path, future) in pending.items():
+                try:
+                    future.result()
+                    screenshot_paths[kind] = str(path.relative_to(self.results_dir))
+                except Exception as e:
+                    logger.error(f"Error saving {kind} screenshot: {e}")
             
         except Exception as e:
             logger.error(f"Error saving screenshots: {e}")
         
         return screenshot_paths
     
+    def _write_image(self, path: Path, result: Dict[str, Any], key: str) -> None:
+        """Write PNG bytes stored under ``<key>_bytes``, or encode the PIL image."""
+        data = result.get(f"{key}_bytes")
+        if path.suffix == '.webp':
+            image = result.get(key)
+            if image is None:
+                image = Image.open(io.BytesIO(data))
+            # method=0 is libwebp's fastest lossless effort
+            image.save(path, format='WEBP', lossless=True, method=0)
+        elif data:
+            path.write_bytes(data)
+        else:
+            self._save_image(path, result[key])
+
+    def _save_image(self, path: Path, image) -> None:
+        """Encode a PIL image as PNG with the configured (fast) compression level."""
+        image.save(path, format='PNG', compress_level=RESULTS_CONFIG.get('png_compress_level', 1))
+    
     def _generate_result_filename(self, result: Dict[str, Any]) -> str:
         """Generate a unique filename for a test result"""
         # Create a string that uniquely identifies this test
         identifier = f"{result['test_name']}_{result['browser']}_{result['device']}_{result['timestamp']}"
         
-        # Clean the identifier for use as filename
-        safe_identifier = "".join(c for c in identifier if c.isalnum() or c in ('_', '-')).rstrip()
-        
-        return safe_identifier[:100]  # Limit length
+        # Hash it for a fixed-length, filesystem-safe, collision-resistant name; the short
+        # browser/device prefix keeps files recognizable when browsing a run directory
+        digest = hashlib.blake2b(identifier.encode('utf-8'), digest_size=8).hexdigest()
+        browser = str(result['browser']).replace(' ', '')[:8]
+        device = str(result['device']).replace(' ', '')[:8]
+        return f"{browser}_{device}_{digest}"
     
     def load_test_results(self, test_id: str) -> List[Dict[str, Any]]:
         """Load all results for a specific test run"""
@@ -131,12 +323,14 @@ class ResultManager:
                 logger.warning(f"Test directory {test_id} not found")
                 return []
             
+            json_files = list(_iter_json_files(test_dir))
             results = []
-            for json_file in test_dir.rglob("*.json"):
+            for json_file, data in zip(json_files, _load_json_files(json_files)):
+                if isinstance(data, Exception):
+                    logger.error(f"Error loading result from {json_file}: {data}")
+                    continue
                 try:
-                    with open(json_file, 'r') as f:
-                        result = json.load(f)
-                        results.append(enrich_test_result(result))
+                    results.append(enrich_test_result(data))
                 except Exception as e:
                     logger.error(f"Error loading result from {json_file}: {e}")
             
@@ -150,42 +344,47 @@ class ResultManager:
         """List all available test runs"""
         try:
             test_runs = []
+            index = self._read_index()
             
-            for test_dir in self.results_dir.iterdir():
-                if test_dir.is_dir():
-                    # Count results in this test run (recursive)
-                    result_count = len(list(test_dir.rglob("*.json")))
+            # scandir entries carry the file type from readdir, saving a stat per entry
+            with os.scandir(self.results_dir) as entries:
+                test_dirs = [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+            
+            for test_dir in test_dirs:
+                if test_dir.name in index:
+                    entries = index[test_dir.name]
+                    test_runs.append({
+                        'test_id': test_dir.name,
+                        'result_count': len(entries),
+                        'latest_timestamp': _latest_timestamp(e.get('timestamp') for e in entries),
+                        'created': test_dir.stat().st_ctime
+                    })
+                    continue
+                
+                # Runs saved before the index existed: count and scan their result files
+                try:
+                    json_files = list(_iter_json_files(test_dir.path))
+                    if not json_files:
+                        continue
                     
-                    if result_count > 0:
-                        # Get the most recent result timestamp
+                    timestamps = []
+                    for json_file, data in zip(json_files, _load_json_files(json_files)):
                         try:
-                            latest_result = None
-                            latest_time = None
-                            
-                            # Look for JSON files recursively in subdirectories
-                            for json_file in test_dir.rglob("*.json"):
-                                try:
-                                    with open(json_file, 'r') as f:
-                                        result = json.load(f)
-                                        if 'timestamp' in result:
-                                            result_time = datetime.fromisoformat(result['timestamp'])
-                                            
-                                            if latest_time is None or result_time > latest_time:
-                                                latest_time = result_time
-                                                latest_result = result
-                                except Exception as json_error:
-                                    logger.warning(f"Error reading JSON file {json_file}: {json_error}")
-                                    continue
-                            
-                            test_runs.append({
-                                'test_id': test_dir.name,
-                                'result_count': result_count,
-                                'latest_timestamp': latest_time.isoformat() if latest_time else None,
-                                'created': test_dir.stat().st_ctime
-                            })
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing test run {test_dir.name}: {e}")
+                            if isinstance(data, Exception):
+                                raise data
+                            timestamps.append(data.get('timestamp'))
+                        except Exception as json_error:
+                            logger.warning(f"Error reading JSON file {json_file}: {json_error}")
+                    
+                    test_runs.append({
+                        'test_id': test_dir.name,
+                        'result_count': len(json_files),
+                        'latest_timestamp': _latest_timestamp(timestamps),
+                        'created': test_dir.stat().st_ctime
+                    })
+                    
+                except Exception as e:
+                    logger.error(f"Error processing test run {test_dir.name}: {e}")
             
             # Sort by creation time (newest first)
             test_runs.sort(key=lambda x: x['created'], reverse=True)
@@ -202,6 +401,7 @@ class ResultManager:
             if test_dir.exists():
                 import shutil
                 shutil.rmtree(test_dir)
+                self._prune_index()
                 logger.info(f"Deleted test run {test_id}")
                 return True
             else:
@@ -215,39 +415,38 @@ class ResultManager:
     def get_summary_stats(self, test_id: str) -> Dict[str, Any]:
         """Get summary statistics for a test run"""
         try:
-            results = self.load_test_results(test_id)
+            # Index entries carry every field needed here; older runs fall back to their files
+            results = self._read_index().get(test_id) or self.load_test_results(test_id)
             
             if not results:
                 return {}
             
+            # Single pass: counts, score sum, and browser/device grouping
             total_tests = len(results)
-            passed_tests = sum(1 for r in results if r.get('is_match', False) and not r.get('is_skipped', False))
-            failed_tests = sum(1 for r in results if not r.get('is_match', False) and not r.get('is_skipped', False))
-            skipped_tests = sum(1 for r in results if r.get('is_skipped', False))
-            
-            # Calculate average similarity score
-            scores = [r.get('similarity_score', 0) for r in results]
-            avg_similarity = sum(scores) / len(scores) if scores else 0
-            
-            # Group by browser and device
+            passed_tests = failed_tests = skipped_tests = 0
+            score_sum = 0.0
             browsers = {}
             devices = {}
             
             for result in results:
-                browser = result.get('browser', 'Unknown')
-                device = result.get('device', 'Unknown')
+                is_match = result.get('is_match', False)
+                if result.get('is_skipped', False):
+                    skipped_tests += 1
+                elif is_match:
+                    passed_tests += 1
+                else:
+                    failed_tests += 1
+                score_sum += result.get('similarity_score', 0)
                 
-                if browser not in browsers:
-                    browsers[browser] = {'total': 0, 'passed': 0}
-                browsers[browser]['total'] += 1
-                if result.get('is_match', False):
-                    browsers[browser]['passed'] += 1
-                
-                if device not in devices:
-                    devices[device] = {'total': 0, 'passed': 0}
-                devices[device]['total'] += 1
-                if result.get('is_match', False):
-                    devices[device]['passed'] += 1
+                browser_stats = browsers.setdefault(result.get('browser', 'Unknown'), {'total': 0, 'passed': 0})
+                device_stats = devices.setdefault(result.get('device', 'Unknown'), {'total': 0, 'passed': 0})
+                browser_stats['total'] += 1
+                device_stats['total'] += 1
+                if is_match:
+                    browser_stats['passed'] += 1
+                    device_stats['passed'] += 1
+            
+            avg_similarity = score_sum / total_tests
             
             return {
                 'total_tests': total_tests,
@@ -271,13 +470,18 @@ class ResultManager:
             cutoff_time = datetime.now().timestamp() - (days_to_keep * 24 * 60 * 60)
             cleaned_count = 0
             
-            for test_dir in self.results_dir.iterdir():
-                if test_dir.is_dir() and test_dir.stat().st_ctime < cutoff_time:
+            with os.scandir(self.results_dir) as entries:
+                test_dirs = [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+            
+            for test_dir in test_dirs:
+                if test_dir.stat().st_ctime < cutoff_time:
                     import shutil
-                    shutil.rmtree(test_dir)
+                    shutil.rmtree(test_dir.path)
                     cleaned_count += 1
                     logger.info(f"Cleaned up old test run: {test_dir.name}")
             
+            if cleaned_count:
+                self._prune_index()
             return cleaned_count
             
         except Exception as e:
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Run one shared Chromium that BrowserManager workers attach to over CDP.
+
+Start it once per host, then export the printed WebSocket URL as
+PLAYWRIGHT_CDP_WS for the Streamlit app and CI runs so Chrome/Edge captures
+reuse this browser instead of launching their own.
+"""
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from browser_automation import BrowserManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S',
+)
+logger = logging.getLogger(__name__)
+
+
+def _bundled_chromium_path():
+    """Return the Playwright-managed Chromium executable."""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+def _wait_for_ws_url(port, timeout=30):
+    """Poll the DevTools HTTP endpoint until the browser WebSocket URL is available."""
+    deadline = time.monotonic() + timeout
+    url = f"http://127.0.0.1:{port}/json/version"
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                return json.load(response)['webSocketDebuggerUrl']
+        except Exception:
+            time.sleep(0.25)
+    raise TimeoutError(f"Chromium did not expose {url} within {timeout}s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Launch a shared Chromium for CDP clients')
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=9222,
+        help='Remote debugging port (default: 9222)',
+    )
+    parser.add_argument(
+        '--executable',
+        default=None,
+        help='Chromium/Chrome executable (default: Playwright bundled Chromium)',
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    launch_options = BrowserManager()._build_launch_options('Chrome')
+    executable = (
+        args.executable
+        or launch_options.get('executable_path')
+        or _bundled_chromium_path()
+    )
+
+    with tempfile.TemporaryDirectory(prefix='vrt-chromium-') as user_data_dir:
+        command = [
+            executable,
+            f'--remote-debugging-port={args.port}',
+            f'--user-data-dir={user_data_dir}',
+            *launch_options['args'],
+        ]
+        logger.info("Starting %s on port %s", executable, args.port)
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            ws_url = _wait_for_ws_url(args.port)
+            logger.info("Shared browser ready; set PLAYWRIGHT_CDP_WS to connect workers")
+            print(ws_url, flush=True)
+            return process.wait()
+        except KeyboardInterrupt:
+            return 0
+        except Exception as e:
+            logger.error("Could not start shared browser: %s", e)
+            return 1
+        finally:
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
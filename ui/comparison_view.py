@@ -1,15 +1,67 @@
 """Detailed comparison panel for a single test result."""
+from io import BytesIO
+
 import streamlit as st
+from PIL import Image
 
 from ui.deps import ImageComparator, PDF_OK, PLAYWRIGHT_DEVICE_MAP
 from ui.export import build_pdf_filename, generate_pdf
-from ui.helpers import load_image_from_result
+from ui.helpers import load_image_bytes_from_result
 from ui.theme import status_chip
 from utils import format_configured_viewport, resize_image_for_display
 
 
+def _encode_png(image):
+    """Encode a PIL image to PNG bytes (fast zlib level: these are cached display copies)."""
+    buffer = BytesIO()
+    image.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _fit_png(image, max_width, max_height, original_bytes=None):
+    """Downscale an image for display and return PNG bytes."""
+    resized = resize_image_for_display(image, max_width=max_width, max_height=max_height)
+    if resized is image and original_bytes is not None:
+        return original_bytes
+    return _encode_png(resized)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _display_png(image_bytes, max_width, max_height):
+    """Return display-sized PNG bytes; cached so reruns skip decode/encode."""
+    return _fit_png(Image.open(BytesIO(image_bytes)), max_width, max_height, image_bytes)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _overlay_png(staging_bytes, production_bytes, opacity):
+    """Return display-sized overlay PNG bytes for one opacity value."""
+    overlay = ImageComparator().create_overlay(
+        Image.open(BytesIO(staging_bytes)),
+        Image.open(BytesIO(production_bytes)),
+        opacity,
+    )
+    return _fit_png(overlay, 1400, 900)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _difference_png(staging_bytes, production_bytes):
+    """Return display-sized diff PNG bytes, or None if no diff could be built."""
+    diff = ImageComparator().create_difference_image(
+        Image.open(BytesIO(staging_bytes)),
+        Image.open(BytesIO(production_bytes)),
+    )
+    if diff is None:
+        return None
+    return _fit_png(diff, 1600, 1600)
+
+
+@st.fragment
 def render_comparison_detail(result_index):
-    """Render side-by-side, overlay, and diff views for one result."""
+    """Render side-by-side, overlay, and diff views for one result.
+
+    Runs as a fragment so switching modes or dragging the opacity slider
+    reruns only this panel instead of the whole results page.
+    """
     result = st.session_state.test_results[result_index]
 
     st.markdown("#### Comparison Detail")
@@ -98,49 +150,46 @@ def render_comparison_detail(result_index):
 
     if comparison_mode == "Side by Side":
         st.markdown('<div class="vrt-image-panel">', unsafe_allow_html=True)
-        staging_loaded = load_image_from_result(result, 'staging_screenshot')
-        production_loaded = load_image_from_result(result, 'production_screenshot')
+        staging_bytes = load_image_bytes_from_result(result, 'staging_screenshot')
+        production_bytes = load_image_bytes_from_result(result, 'production_screenshot')
 
-        if staging_loaded is None and production_loaded is None:
+        if staging_bytes is None and production_bytes is None:
             st.info("No screenshots available for this test.")
-        elif staging_loaded is not None and production_loaded is not None:
+        elif staging_bytes is not None and production_bytes is not None:
             col1, col2 = st.columns(2)
             with col1:
                 st.subheader("Staging")
-                img = resize_image_for_display(staging_loaded, max_width=1200, max_height=1600)
-                st.image(img, use_container_width=True)
+                st.image(_display_png(staging_bytes, 1200, 1600), use_container_width=True)
                 st.caption(result.get('staging_url', 'URL not available'))
             with col2:
                 st.subheader("Production")
-                img = resize_image_for_display(production_loaded, max_width=1200, max_height=1600)
-                st.image(img, use_container_width=True)
+                st.image(_display_png(production_bytes, 1200, 1600), use_container_width=True)
                 st.caption(result.get('production_url', 'URL not available'))
         else:
-            available_label = "Staging" if staging_loaded is not None else "Production"
+            available_label = "Staging" if staging_bytes is not None else "Production"
             available_url = (
                 result.get('staging_url')
-                if staging_loaded is not None
+                if staging_bytes is not None
                 else result.get('production_url')
             )
-            available_img = staging_loaded if staging_loaded is not None else production_loaded
+            available_bytes = staging_bytes if staging_bytes is not None else production_bytes
             st.subheader(available_label)
-            img = resize_image_for_display(available_img, max_width=1400, max_height=1600)
-            st.image(img, use_container_width=True)
+            st.image(_display_png(available_bytes, 1400, 1600), use_container_width=True)
             st.caption(available_url or 'URL not available')
         st.markdown('</div>', unsafe_allow_html=True)
 
     elif comparison_mode == "Overlay":
         st.subheader("Overlay Comparison")
-        staging_loaded = load_image_from_result(result, 'staging_screenshot')
-        production_loaded = load_image_from_result(result, 'production_screenshot')
-        if staging_loaded is not None and production_loaded is not None:
+        staging_bytes = load_image_bytes_from_result(result, 'staging_screenshot')
+        production_bytes = load_image_bytes_from_result(result, 'production_screenshot')
+        if staging_bytes is not None and production_bytes is not None:
             opacity = st.slider("Staging Opacity", 0.0, 1.0, 0.5, 0.1, key=f"opacity_{result_index}")
             with st.spinner("Generating overlay..."):
                 try:
-                    comparator = ImageComparator()
-                    overlay_image = comparator.create_overlay(staging_loaded, production_loaded, opacity)
-                    overlay_resized = resize_image_for_display(overlay_image, max_width=1400, max_height=900)
-                    st.image(overlay_resized, use_container_width=True)
+                    st.image(
+                        _overlay_png(staging_bytes, production_bytes, opacity),
+                        use_container_width=True,
+                    )
                 except Exception as e:
                     st.error(f"Error creating overlay: {e}")
         else:
@@ -148,21 +197,22 @@ def render_comparison_detail(result_index):
 
     elif comparison_mode == "Difference Only":
         st.subheader("Visual Differences")
-        diff_loaded = load_image_from_result(result, 'diff_image')
-        if diff_loaded is None:
-            staging_loaded = load_image_from_result(result, 'staging_screenshot')
-            production_loaded = load_image_from_result(result, 'production_screenshot')
-            if staging_loaded is not None and production_loaded is not None:
+        diff_png = None
+        diff_bytes = load_image_bytes_from_result(result, 'diff_image')
+        if diff_bytes is not None:
+            diff_png = _display_png(diff_bytes, 1600, 1600)
+        else:
+            staging_bytes = load_image_bytes_from_result(result, 'staging_screenshot')
+            production_bytes = load_image_bytes_from_result(result, 'production_screenshot')
+            if staging_bytes is not None and production_bytes is not None:
                 with st.spinner("Computing visual diff..."):
                     try:
-                        comparator = ImageComparator()
-                        diff_loaded = comparator.create_difference_image(staging_loaded, production_loaded)
+                        diff_png = _difference_png(staging_bytes, production_bytes)
                     except Exception as e:
                         st.error(f"Error generating difference image: {e}")
-                        diff_loaded = None
-        if diff_loaded is not None:
-            img = resize_image_for_display(diff_loaded, max_width=1600, max_height=1600)
-            st.image(img, use_container_width=True)
+                        diff_png = None
+        if diff_png is not None:
+            st.image(diff_png, use_container_width=True)
             st.caption("Red areas indicate differences between staging and production")
         else:
             st.info("No differences detected or difference image not available")
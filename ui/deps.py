@@ -4,18 +4,19 @@ import logging
 logger = logging.getLogger(__name__)
 
 try:
-    from browser_automation import BrowserManager
+    from browser_automation import BrowserManager, get_manager, run_in_browser_loop, submit_to_browser_loop
     from image_comparison import ImageComparator
     from result_manager import ResultManager
-    from config import BROWSERS, DEVICES, VIEWPORT_CONFIGS, PLAYWRIGHT_DEVICE_MAP
+    from config import BROWSERS, DEFAULT_SETTINGS, DEVICES, VIEWPORT_CONFIGS, PLAYWRIGHT_DEVICE_MAP
     IMPORTS_OK = True
 except ImportError as e:
     logger.error("Import error: %s", e)
     IMPORTS_OK = False
-    BrowserManager = None
+    BrowserManager = get_manager = run_in_browser_loop = submit_to_browser_loop = None
     ImageComparator = None
     ResultManager = None
     BROWSERS = {'Chrome': {}}
+    DEFAULT_SETTINGS = {'screenshot_format': 'png'}
     DEVICES = {'Desktop': {}}
     VIEWPORT_CONFIGS = {'Desktop': {'width': 1920, 'height': 1080}}
     PLAYWRIGHT_DEVICE_MAP = {}
@@ -1,4 +1,5 @@
 """Export results to ZIP and generate PDF reports."""
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import zipfile
 
@@ -8,19 +9,36 @@ from reports.generator import build_report_filename, generate_pdf_report
 from ui.deps import PDF_OK, ResultManager
 from utils import safe_results_path
 
+# Screenshots are already compressed; deflating them again only burns CPU.
+_STORED_SUFFIXES = frozenset({'.png', '.jpg', '.jpeg', '.webp'})
+
 
 def export_selected_runs(run_ids, result_manager):
     """Write selected test_results/<run_id> trees into a single ZIP file."""
     try:
+        files = []
+        for run_id in run_ids:
+            run_dir = result_manager.results_dir / run_id
+            if run_dir.exists():
+                files.extend(
+                    (file_path, f"{run_id}/{file_path.relative_to(run_dir)}")
+                    for file_path in sorted(run_dir.rglob('*'))
+                    if file_path.is_file()
+                )
+
         zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for run_id in run_ids:
-                run_dir = result_manager.results_dir / run_id
-                if run_dir.exists():
-                    for file_path in run_dir.rglob('*'):
-                        if file_path.is_file():
-                            arc_name = f"{run_id}/{file_path.relative_to(run_dir)}"
-                            zip_file.write(file_path, arc_name)
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file, \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            # map yields in path order, so entries keep a fixed order and each file's
+            # bytes are dropped once written
+            contents = executor.map(lambda item: item[0].read_bytes(), files)
+            for (file_path, arc_name), content in zip(files, contents):
+                compress_type = (
+                    zipfile.ZIP_STORED
+                    if file_path.suffix.lower() in _STORED_SUFFIXES
+                    else zipfile.ZIP_DEFLATED
+                )
+                zip_file.writestr(arc_name, content, compress_type=compress_type)
 
         zip_buffer.seek(0)
         data = zip_buffer.read()
@@ -1,12 +1,18 @@
 """Shared helpers for test execution and image loading."""
+import asyncio
+import logging
 import os
 import subprocess
 from datetime import datetime
+from io import BytesIO
 
+from image_comparison import ImageComparator
 from result_manager import ResultManager
 from config import VIEWPORT_CONFIGS, PLAYWRIGHT_DEVICE_MAP
 from utils import safe_results_path
 
+logger = logging.getLogger(__name__)
+
 
 def build_skipped_result(url_pair, browser, device, selected_region,
                          reason='Screenshot capture failed or test execution error'):
@@ -34,30 +40,119 @@ def build_skipped_result(url_pair, browser, device, selected_region,
     }
 
 
+def compare_captures(staging, production, similarity_threshold, encode=False):
+    """Decode two captured screenshots and compare them.
+
+    CPU-bound; callers run it in an executor. Returns the comparison result
+    plus the decoded images, and their PNG bytes for storage when ``encode``
+    is set (callers that never save results skip the re-encode).
+    """
+    comparison_result = ImageComparator().compare_images(
+        staging.image, production.image, similarity_threshold,
+    )
+    compared = {
+        'comparison': comparison_result,
+        'staging_screenshot': staging.image,
+        'production_screenshot': production.image,
+    }
+    if encode:
+        compared['staging_screenshot_bytes'] = staging.png_bytes
+        compared['production_screenshot_bytes'] = production.png_bytes
+    return compared
+
+
+async def warm_test_origins(browser_manager, url_pairs, browsers, devices, selected_region, run_id=None):
+    """Preconnect every browser/device context of a run to the staging and production origins."""
+    urls = [url for pair in url_pairs for url in (pair['staging_url'], pair['production_url'])]
+    region = selected_region if selected_region != "Default" else None
+    results = await asyncio.gather(
+        *(
+            browser_manager.warm_origins(
+                urls, browser, VIEWPORT_CONFIGS[device], device_name=device, region=region,
+                run_id=run_id,
+            )
+            for browser in browsers
+            for device in devices
+        ),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.debug("Origin warm-up failed: %s", result)
+
+
+_PATH_KEY_MAP = {
+    'staging_screenshot': 'staging',
+    'production_screenshot': 'production',
+    'diff_image': 'diff',
+}
+
+
+def _result_image_path(record, key):
+    """Resolve the saved screenshot path for a result record, if it exists."""
+    spaths = record.get('screenshot_paths', {}) or {}
+    rel = spaths.get(_PATH_KEY_MAP.get(key, ''), None)
+    if rel:
+        base = ResultManager().results_dir
+        fp = safe_results_path(base, rel)
+        if fp and fp.exists():
+            return fp
+    return None
+
+
+def release_result_images(record):
+    """Drop in-memory images that have been saved to disk.
+
+    Keeps session state small; the UI reloads saved screenshots on demand.
+    """
+    saved = record.get('screenshot_paths') or {}
+    for key, path_key in _PATH_KEY_MAP.items():
+        if saved.get(path_key):
+            record[key] = None
+            record.pop(f"{key}_bytes", None)
+    return record
+
+
 def load_image_from_result(record, key):
     """Load a screenshot from memory or disk for a result record."""
     try:
         img = record.get(key)
         if img is not None:
             return img
-        path_key_map = {
-            'staging_screenshot': 'staging',
-            'production_screenshot': 'production',
-            'diff_image': 'diff'
-        }
-        spaths = record.get('screenshot_paths', {}) or {}
-        rel = spaths.get(path_key_map.get(key, ''), None)
-        if rel:
-            base = ResultManager().results_dir
-            fp = safe_results_path(base, rel)
-            if fp and fp.exists():
-                from PIL import Image as PILImage
-                return PILImage.open(fp)
+        fp = _result_image_path(record, key)
+        if fp is not None:
+            from PIL import Image as PILImage
+            return PILImage.open(fp)
     except Exception:
         return None
     return None
 
 
+def load_image_bytes_from_result(record, key):
+    """Return encoded image bytes for a result record.
+
+    Saved screenshots are read straight from disk. In-memory images are
+    encoded to PNG once and cached on the record under ``<key>_bytes``.
+    """
+    try:
+        data = record.get(f"{key}_bytes")
+        if data is not None:
+            return data
+        fp = _result_image_path(record, key)
+        if fp is not None:
+            return fp.read_bytes()
+        img = record.get(key)
+        if img is None:
+            return None
+        buffer = BytesIO()
+        img.save(buffer, format='PNG', compress_level=1)
+        data = buffer.getvalue()
+        record[f"{key}_bytes"] = data
+        return data
+    except Exception:
+        return None
+
+
 def should_use_parallel_processing():
     """Determine if parallel processing should be used."""
     try:
@@ -1,5 +1,6 @@
 """History page — browse, load, export, and delete saved test runs."""
 import logging
+import os
 import shutil
 
 import pandas as pd
@@ -13,6 +14,20 @@ from ui.theme import render_page_header
 logger = logging.getLogger(__name__)
 
 
+def _dir_size(path):
+    """Return the total size in bytes of regular files under path."""
+    total = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
 def history_page():
     """List saved runs and load results into the Results page."""
     render_page_header(
@@ -33,7 +48,7 @@ def history_page():
         for run in test_runs:
             run_path = result_manager.results_dir / run['test_id']
             if run_path.exists():
-                total_size += sum(f.stat().st_size for f in run_path.rglob('*') if f.is_file())
+                total_size += _dir_size(run_path)
     except Exception:
         total_size = 0
 
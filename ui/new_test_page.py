@@ -17,6 +17,22 @@ from utils import validate_url_pairs
 logger = logging.getLogger(__name__)
 
 
+def _add_url_pair():
+    """Show one more manual URL pair row."""
+    st.session_state.url_pairs_count += 1
+
+
+def _remove_url_pair():
+    """Drop the last manual URL pair row, keeping at least one."""
+    if st.session_state.url_pairs_count > 1:
+        st.session_state.url_pairs_count -= 1
+
+
+def _request_run():
+    """Flag a run request; validation happens with this run's URL pairs."""
+    st.session_state.run_requested = True
+
+
 def _render_test_settings():
     """Collect browsers, devices, region, threshold, and wait time."""
     col1, col2 = st.columns(2)
@@ -60,7 +76,7 @@ def _render_test_settings():
             min_value=1,
             max_value=30,
             value=3,
-            help="Time to wait for page to fully load (recommended: 3s for slower sites)",
+            help="Maximum time to wait for network activity to settle; idle pages continue sooner",
         )
 
     return selected_browsers, selected_devices, selected_region, similarity_threshold, wait_time
@@ -90,9 +106,7 @@ def _collect_url_pairs():
                 production_url = st.text_input(f"Production URL {i+1}", key=f"production_{i}")
             with col3:
                 st.write("")
-                if st.button("Remove", key=f"remove_{i}") and st.session_state.url_pairs_count > 1:
-                    st.session_state.url_pairs_count -= 1
-                    st.rerun()
+                st.button("Remove", key=f"remove_{i}", on_click=_remove_url_pair)
 
             if staging_url and production_url:
                 url_pairs.append({
@@ -103,9 +117,7 @@ def _collect_url_pairs():
 
         col1, _ = st.columns([1, 4])
         with col1:
-            if st.button("Add More URLs"):
-                st.session_state.url_pairs_count += 1
-                st.rerun()
+            st.button("Add More URLs", on_click=_add_url_pair)
 
     else:
         st.subheader("Upload CSV File")
@@ -127,6 +139,24 @@ def _collect_url_pairs():
     return url_pairs
 
 
+def _validate_run_config(url_pairs, selected_browsers, selected_devices):
+    """Show errors for a requested run; return True when it can start."""
+    if not selected_browsers:
+        st.error("Please select at least one browser")
+        return False
+    if not selected_devices:
+        st.error("Please select at least one device")
+        return False
+
+    invalid_urls = validate_url_pairs(url_pairs)
+    if invalid_urls:
+        for name, field, url in invalid_urls:
+            st.error(f"Invalid {field.replace('_', ' ')} in '{name}': {url}")
+        st.info("Only http/https URLs are allowed. Cloud metadata endpoints are blocked.")
+        return False
+    return True
+
+
 def _handle_run_controls(
     url_pairs,
     selected_browsers,
@@ -139,27 +169,12 @@ def _handle_run_controls(
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        run_tests_clicked = st.button(
-            "Run Visual Regression Tests",
-            type="primary",
-            disabled=st.session_state.test_running,
-        )
-
-        if run_tests_clicked and url_pairs:
-            if not selected_browsers:
-                st.error("Please select at least one browser")
-                return
-            if not selected_devices:
-                st.error("Please select at least one device")
-                return
-
-            invalid_urls = validate_url_pairs(url_pairs)
-            if invalid_urls:
-                for name, field, url in invalid_urls:
-                    st.error(f"Invalid {field.replace('_', ' ')} in '{name}': {url}")
-                st.info("Only http/https URLs are allowed. Cloud metadata endpoints are blocked.")
-                return
-
+        # Validation errors are shown without returning so the Run button below still renders
+        if (
+            st.session_state.pop('run_requested', False)
+            and url_pairs
+            and _validate_run_config(url_pairs, selected_browsers, selected_devices)
+        ):
             logger.info("Starting visual regression tests...")
             logger.info(
                 "Configuration: %s URLs, %s browsers, %s devices",
@@ -167,10 +182,15 @@ def _handle_run_controls(
             )
             logger.info("Settings: %s%% threshold, %ss wait time", similarity_threshold, wait_time)
 
-            st.info("**Starting tests...** Initializing browsers and preparing test environment...")
             st.session_state.stop_testing = False
             st.session_state.test_running = True
-            st.rerun()
+
+        st.button(
+            "Run Visual Regression Tests",
+            type="primary",
+            disabled=st.session_state.test_running,
+            on_click=_request_run,
+        )
 
     with col2:
         if st.session_state.test_running:
@@ -1,4 +1,5 @@
 """Results page — summary and detailed comparison tabs."""
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -6,7 +7,7 @@ from ui.comparison_view import render_comparison_detail
 from ui.deps import PLAYWRIGHT_DEVICE_MAP
 from ui.export import export_results
 from ui.session import request_nav
-from utils import format_configured_viewport
+from utils import format_configured_viewport, summarize_results
 from ui.theme import render_page_header
 
 
@@ -43,16 +44,11 @@ def _render_test_results_tab():
     """Show aggregate metrics, filters, table, and export."""
     df = _build_results_dataframe()
 
+    summary = summarize_results(st.session_state.test_results)
     total_tests = len(df)
-    passed_tests = sum(
-        1 for r in st.session_state.test_results
-        if r['is_match'] and not r.get('is_skipped', False)
-    )
-    failed_tests = sum(
-        1 for r in st.session_state.test_results
-        if not r['is_match'] and not r.get('is_skipped', False)
-    )
-    skipped_tests = sum(1 for r in st.session_state.test_results if r.get('is_skipped', False))
+    passed_tests = summary['passed']
+    failed_tests = summary['failed']
+    skipped_tests = summary['skipped']
 
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
@@ -87,13 +83,14 @@ def _render_test_results_tab():
             help="Limit results to a specific device type",
         )
 
-    filtered_df = df.copy()
+    mask = np.ones(len(df), dtype=bool)
     if status_filter != "All":
-        filtered_df = filtered_df[filtered_df['Status'] == status_filter]
+        mask &= df['Status'].values == status_filter
     if browser_filter != "All":
-        filtered_df = filtered_df[filtered_df['Browser'] == browser_filter]
+        mask &= df['Browser'].values == browser_filter
     if device_filter != "All":
-        filtered_df = filtered_df[filtered_df['Device'] == device_filter]
+        mask &= df['Device'].values == device_filter
+    filtered_df = df if mask.all() else df[mask]
 
     if len(filtered_df) > 0:
         st.dataframe(filtered_df, use_container_width=True, hide_index=True)
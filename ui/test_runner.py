@@ -3,6 +3,7 @@ import asyncio
 import logging
 import os
 import platform
+import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
@@ -10,47 +11,71 @@ import streamlit as st
 
 from ui.session import request_nav
 from ui.deps import (
-    BrowserManager,
-    ImageComparator,
+    DEFAULT_SETTINGS,
     ResultManager,
     PLAYWRIGHT_DEVICE_MAP,
     VIEWPORT_CONFIGS,
+    get_manager,
+    run_in_browser_loop,
+    submit_to_browser_loop,
 )
 from ui.helpers import (
     build_skipped_result,
+    compare_captures,
     get_optimal_worker_count,
     is_rancher_desktop,
     is_wsl_environment,
+    release_result_images,
     should_use_parallel_processing,
+    warm_test_origins,
 )
+from utils import summarize_results
 
 logger = logging.getLogger(__name__)
 
 
-async def run_single_test(url_pair, browser, device, similarity_threshold, wait_time, selected_region):
-    """Run one test case and return a result record with images/metrics."""
-    browser_manager = None
-    try:
-        if st.session_state.get('stop_testing', False):
-            logger.info(
-                "Test %s (%s, %s) skipped - tests stopped by user",
-                url_pair['name'], browser, device,
-            )
-            return None
+class _RunProgress:
+    """``st.progress`` bar that only sends an update when the whole percent changes."""
 
-        browser_manager = BrowserManager()
+    def __init__(self):
+        self._bar = st.progress(0)
+        self._pct = 0
+
+    def update(self, done, total):
+        pct = int(done * 100 / total) if total else 0
+        if pct != self._pct:
+            self._pct = pct
+            self._bar.progress(pct)
+
+
+async def run_single_test(url_pair, browser, device, similarity_threshold, wait_time, selected_region, run_id=None):
+    """Run one test case and return a result record with images/metrics.
+
+    ``run_id`` keeps this run's browser contexts apart from other sessions' runs.
+    """
+    try:
+        # Browsers stay open across tests and runs; only pages and contexts are recycled
+        browser_manager = get_manager()
         viewport = VIEWPORT_CONFIGS[device]
         region = selected_region if selected_region != "Default" else None
         logger.info("Taking screenshots for %s with region: %s", url_pair['name'], region)
 
-        staging_capture = await browser_manager.take_screenshot(
-            url_pair['staging_url'], browser, viewport, wait_time,
-            device_name=device, return_metrics=True, region=region,
-        )
-        production_capture = await browser_manager.take_screenshot(
-            url_pair['production_url'], browser, viewport, wait_time,
-            device_name=device, return_metrics=True, region=region,
-        )
+        # Staging and production are independent page loads; capture them concurrently
+        capture_options = {
+            'browser_name': browser, 'viewport': viewport, 'wait_time': wait_time,
+            'device_name': device, 'return_metrics': True, 'region': region,
+            'screenshot_format': DEFAULT_SETTINGS['screenshot_format'], 'run_id': run_id,
+        }
+        staging_capture, production_capture = await browser_manager.screenshot_many([
+            {'url': url_pair['staging_url'], **capture_options},
+            {'url': url_pair['production_url'], **capture_options},
+        ])
+        if isinstance(staging_capture, BaseException):
+            logger.error("Staging capture raised: %s", staging_capture)
+            staging_capture = None
+        if isinstance(production_capture, BaseException):
+            logger.error("Production capture raised: %s", production_capture)
+            production_capture = None
 
         staging_screenshot, staging_metrics = (
             staging_capture if isinstance(staging_capture, tuple) else (staging_capture, {})
@@ -66,10 +91,13 @@ async def run_single_test(url_pair, browser, device, similarity_threshold, wait_
             )
             return None
 
-        comparator = ImageComparator()
-        comparison_result = comparator.compare_images(
-            staging_screenshot, production_screenshot, similarity_threshold,
+        # Decoding and pixel comparison are CPU-bound; keep them off the event loop
+        compared = await asyncio.get_running_loop().run_in_executor(
+            None,
+            compare_captures,
+            staging_screenshot, production_screenshot, similarity_threshold, True,
         )
+        comparison_result = compared['comparison']
 
         result = {
             'test_name': url_pair['name'],
@@ -80,8 +108,10 @@ async def run_single_test(url_pair, browser, device, similarity_threshold, wait_
             'production_url': url_pair['production_url'],
             'similarity_score': comparison_result['similarity_score'],
             'is_match': comparison_result['is_match'],
-            'staging_screenshot': staging_screenshot,
-            'production_screenshot': production_screenshot,
+            'staging_screenshot': compared['staging_screenshot'],
+            'production_screenshot': compared['production_screenshot'],
+            'staging_screenshot_bytes': compared['staging_screenshot_bytes'],
+            'production_screenshot_bytes': compared['production_screenshot_bytes'],
             'diff_image': comparison_result['diff_image'],
             'timestamp': datetime.now().isoformat(),
             'viewport_width': viewport.get('width'),
@@ -102,18 +132,18 @@ async def run_single_test(url_pair, browser, device, similarity_threshold, wait_
         import traceback
         logger.error("Traceback: %s", traceback.format_exc())
         return None
-    finally:
-        if browser_manager is not None:
-            try:
-                await browser_manager.cleanup()
-            except Exception as cleanup_error:
-                logger.warning("Error during browser cleanup: %s", cleanup_error)
 
 
-def run_single_test_sync(url_pair, browser, device, similarity_threshold, wait_time, selected_region):
+def run_single_test_sync(url_pair, browser, device, similarity_threshold, wait_time, selected_region, run_id=None):
     """Synchronous wrapper for run_single_test to use with ThreadPoolExecutor."""
-    return asyncio.run(
-        run_single_test(url_pair, browser, device, similarity_threshold, wait_time, selected_region),
+    if st.session_state.get('stop_testing', False):
+        logger.info(
+            "Test %s (%s, %s) skipped - tests stopped by user",
+            url_pair['name'], browser, device,
+        )
+        return None
+    return run_in_browser_loop(
+        run_single_test(url_pair, browser, device, similarity_threshold, wait_time, selected_region, run_id),
     )
 
 
@@ -128,7 +158,7 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
     logger.info("Test configuration validated! Starting execution of %s tests...", total_tests)
     st.success("**Test configuration validated!** Starting execution...")
 
-    progress_bar = st.progress(0)
+    progress_bar = _RunProgress()
     status_text = st.empty()
     status_text.text("**Initializing...** Setting up browsers and test environment...")
 
@@ -149,7 +179,19 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
     st.session_state.current_test_id = test_id
     results = []
 
+    # The manager is shared by every session; this run's contexts are keyed by run_id
+    # so they start fresh and are closed at the end without touching other runs
+    browser_manager = get_manager()
+    run_id = uuid.uuid4().hex
+    warmup = None
+
     try:
+        # Browsers launch and origins warm up in the background meanwhile
+        submit_to_browser_loop(browser_manager.prelaunch(list(browsers)))
+        warmup = submit_to_browser_loop(
+            warm_test_origins(browser_manager, url_pairs, browsers, devices, selected_region, run_id=run_id),
+        )
+
         use_parallel = should_use_parallel_processing()
         worker_count = get_optimal_worker_count()
 
@@ -205,7 +247,7 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
                 future_to_task = {
                     executor.submit(
                         run_single_test_sync, url_pair, browser, device,
-                        similarity_threshold, wait_time, selected_region,
+                        similarity_threshold, wait_time, selected_region, run_id,
                     ): (url_pair, browser, device)
                     for url_pair, browser, device in test_tasks
                 }
@@ -223,8 +265,7 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
 
                     url_pair, browser, device = future_to_task[future]
                     current_test += 1
-                    progress = current_test / total_tests
-                    progress_bar.progress(int(progress * 100))
+                    progress_bar.update(current_test, total_tests)
 
                     elapsed = (datetime.now() - start_time).total_seconds()
                     if 1 < current_test < total_tests:
@@ -246,8 +287,9 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
                     try:
                         result = future.result()
                         if result:
+                            if result_manager.save_result(test_id, result):
+                                release_result_images(result)
                             results.append(result)
-                            result_manager.save_result(test_id, result)
                             if result.get('is_match'):
                                 passed_count += 1
                                 logger.info(
@@ -292,8 +334,7 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
                             return
 
                         current_test += 1
-                        progress = current_test / total_tests
-                        progress_bar.progress(int(progress * 100))
+                        progress_bar.update(current_test, total_tests)
 
                         logger.info(
                             "Test %s/%s: %s - %s %s",
@@ -316,16 +357,17 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
                             f"({current_test}/{total_tests})",
                         )
 
-                        result = asyncio.run(
+                        result = run_in_browser_loop(
                             run_single_test(
                                 url_pair, browser, device,
-                                similarity_threshold, wait_time, selected_region,
+                                similarity_threshold, wait_time, selected_region, run_id,
                             ),
                         )
 
                         if result:
+                            if result_manager.save_result(test_id, result):
+                                release_result_images(result)
                             results.append(result)
-                            result_manager.save_result(test_id, result)
                             if result.get('is_match'):
                                 passed_count += 1
                                 logger.info(
@@ -353,17 +395,17 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
                         m_skipped.metric("Skipped", skipped_count)
 
         st.session_state.test_results = results
-        progress_bar.progress(100)
+        progress_bar.update(total_tests, total_tests)
         total_time = (datetime.now() - start_time).total_seconds()
         logger.info("All tests completed successfully in %.1f seconds!", total_time)
         status_text.text("All tests completed successfully!")
         timing_text.text(f"Total time: {total_time:.1f}s")
 
         if len(results) > 0:
-            passed = sum(1 for r in results if r.get('is_match') and not r.get('is_skipped', False))
-            failed = sum(1 for r in results if not r.get('is_match') and not r.get('is_skipped', False))
-            scored = [r['similarity_score'] for r in results if not r.get('is_skipped', False)]
-            avg_similarity = sum(scored) / len(scored) if scored else 0
+            summary = summarize_results(results)
+            passed = summary['passed']
+            failed = summary['failed']
+            avg_similarity = summary['avg_similarity']
 
             logger.info(
                 "Results Summary: %s passed, %s failed, %s skipped | Average similarity: %.1f%%",
@@ -390,17 +432,19 @@ def run_tests(url_pairs, browsers, devices, similarity_threshold, wait_time, sel
     except Exception as e:
         st.error(f"Error during testing: {str(e)}")
     finally:
+        # A warm-up still waiting on the browser launch would otherwise pool contexts after the reset
+        if warmup is not None:
+            warmup.cancel()
+        submit_to_browser_loop(browser_manager.reset_contexts(run_id))
         st.session_state.test_running = False
         st.session_state.tests_started = False
         results = st.session_state.get('test_results') or []
         if results and not st.session_state.get('stop_testing') and not st.session_state.get('cleanup_needed'):
-            passed = sum(1 for r in results if r.get('is_match') and not r.get('is_skipped', False))
-            failed = sum(1 for r in results if not r.get('is_match') and not r.get('is_skipped', False))
-            skipped = sum(1 for r in results if r.get('is_skipped', False))
+            summary = summarize_results(results)
             request_nav("Results")
             st.session_state.banner_message = (
-                f"Completed {len(results)} tests — {passed} passed, {failed} failed, "
-                f"{skipped} skipped. Review results below."
+                f"Completed {len(results)} tests — {summary['passed']} passed, "
+                f"{summary['failed']} failed, {summary['skipped']} skipped. Review results below."
             )
             st.session_state.banner_type = "success"
             st.rerun()
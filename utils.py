@@ -2,8 +2,9 @@
 import ipaddress
 import os
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 
 from PIL import Image
 import logging
@@ -16,6 +17,7 @@ BLOCKED_HOSTS = frozenset({
     'metadata.google.internal',
     'metadata.goog',
 })
+LINK_LOCAL_NETWORK = ipaddress.ip_network('169.254.0.0/16')
 
 
 def validate_url(url):
@@ -25,8 +27,15 @@ def validate_url(url):
     url = url.strip()
     if len(url) > 2048:
         return False
+    return _is_allowed_url(url)
+
+
+@lru_cache(maxsize=512)
+def _is_allowed_url(url):
+    """Scheme/host checks for ``validate_url``; cached since a run's URLs repeat on every rerun."""
     try:
-        result = urlparse(url)
+        # urlsplit: the ;params split done by urlparse is not needed for these checks
+        result = urlsplit(url)
         if result.scheme not in ALLOWED_URL_SCHEMES:
             return False
         if not result.netloc:
@@ -42,7 +51,7 @@ def validate_url(url):
 
         try:
             addr = ipaddress.ip_address(host)
-            if addr.is_link_local or addr in ipaddress.ip_network('169.254.0.0/16'):
+            if addr.is_link_local or addr in LINK_LOCAL_NETWORK:
                 return False
         except ValueError:
             pass
@@ -110,6 +119,29 @@ def enrich_test_result(result):
     return result
 
 
+def summarize_results(results):
+    """Count passed/failed/skipped results and average non-skipped similarity in one pass."""
+    passed = failed = skipped = 0
+    score_sum = 0.0
+    for result in results:
+        if result.get('is_skipped', False):
+            skipped += 1
+            continue
+        if result.get('is_match'):
+            passed += 1
+        else:
+            failed += 1
+        score_sum += result.get('similarity_score', 0)
+    scored = passed + failed
+    return {
+        'total': passed + failed + skipped,
+        'passed': passed,
+        'failed': failed,
+        'skipped': skipped,
+        'avg_similarity': score_sum / scored if scored else 0,
+    }
+
+
 def format_configured_viewport(result):
     """Return configured viewport dimensions for display."""
     enrich_test_result(result)
@@ -120,8 +152,13 @@ def format_configured_viewport(result):
     return "?x?"
 
 
-def resize_image_for_display(image, max_width=800, max_height=600):
-    """Resize image for display while maintaining aspect ratio."""
+def resize_image_for_display(image, max_width=800, max_height=600, resample=Image.Resampling.LANCZOS):
+    """Resize image for display while maintaining aspect ratio.
+
+    Returns ``image`` itself when it already fits; callers rely on that to reuse
+    the original bytes. ``resample`` lets callers that only need the size (tests,
+    throwaway thumbnails) pick a cheaper filter than LANCZOS.
+    """
     try:
         width, height = image.size
 
@@ -130,9 +167,9 @@ def resize_image_for_display(image, max_width=800, max_height=600):
         scale = min(width_scale, height_scale, 1.0)
 
         if scale < 1.0:
-            new_width = int(width * scale)
-            new_height = int(height * scale)
-            return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            new_size = (int(width * scale), int(height * scale))
+            # reducing_gap box-reduces first so LANCZOS only filters ~2x the target size
+            return image.resize(new_size, resample, reducing_gap=2.0)
 
         return image
 